@@ -1,48 +1,174 @@
 import numpy as np
 from PIL import Image
 import os
+import time
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from logo_format import PYRAMID_LEVELS, build_logo_pyramid, save_logo_matrix, save_logo_pyramid
 
 SIZE = 512
 
-def convert_logo_to_matrix(image_path, output_npy_path=None):
+# 红色和白色的RGB值
+RED = (202, 43, 47)
+WHITE = (255, 255, 255)
+
+# 增量构建清单：记录每个源图片的内容哈希与转换参数
+MANIFEST_NAME = ".logo_manifest.json"
+
+# 超过该像素数的图片（高精度扫描件）改用低内存方式读取
+LARGE_IMAGE_PIXELS = 4096 * 4096
+# 分条带读取时每条带的最大字节数
+BAND_BYTES = 8 * 1024 * 1024
+# 未压缩像素格式每像素的位数
+_RAW_BITS = {'1': 1, 'L': 8, 'P': 8, 'RGB': 24, 'BGR': 24,
+             'RGBA': 32, 'BGRA': 32, 'RGBX': 32, 'BGRX': 32}
+
+def _accumulate_area(acc, counts, band, y0, x0, height, width, size):
+    """把原图中的一块像素按面积平均累加到 size×size 的目标网格"""
+    rows, cols = band.shape[:2]
+    ty = np.arange(y0, y0 + rows) * size // height
+    tx = np.arange(x0, x0 + cols) * size // width
+    # 目标行/列号单调不减，每组的起始下标即可用于reduceat分组求和
+    ry = np.flatnonzero(np.diff(ty, prepend=-1))
+    rx = np.flatnonzero(np.diff(tx, prepend=-1))
+    sums = np.add.reduceat(band, ry, axis=0, dtype=np.uint32)
+    sums = np.add.reduceat(sums, rx, axis=1, dtype=np.uint64)
+    acc[np.ix_(ty[ry], tx[rx])] += sums
+    counts[np.ix_(ty[ry], tx[rx])] += np.outer(np.diff(np.append(ry, rows)),
+                                               np.diff(np.append(rx, cols)))
+
+def _reduce_raw_tiles(img, image_path, size):
     """
-    将校徽图片转换为128x128的0-1矩阵
+    未压缩图片按行条带逐块读取原始像素，面积平均缩小为 size×size
+    
+    返回:
+    RGB数组；图片不是未压缩格式时返回None
+    """
+    # 先取出分块信息：getpalette()等会触发整幅解码并清空img.tile
+    tiles = list(img.tile)
+    if not tiles or any(tile[0] != 'raw' for tile in tiles):
+        return None
+    width, height = img.size
+    palette = img.palette if img.mode == 'P' else None
+    acc = np.zeros((size, size, 3), dtype=np.float64)
+    counts = np.zeros((size, size), dtype=np.float64)
+    with open(image_path, 'rb') as f:
+        for _, (x0, y0, x1, y1), offset, args in tiles:
+            if isinstance(args, str):
+                args = (args,)
+            rawmode, stride, orientation = (tuple(args) + (0, 1))[:3]
+            if rawmode not in _RAW_BITS:
+                return None
+            tile_w, tile_h = x1 - x0, y1 - y0
+            row_bytes = stride or (tile_w * _RAW_BITS[rawmode] + 7) // 8
+            band_rows = max(1, BAND_BYTES // row_bytes)
+            for r0 in range(0, tile_h, band_rows):
+                rows = min(band_rows, tile_h - r0)
+                # orientation为-1时文件中自下而上存储
+                file_row = r0 if orientation >= 0 else tile_h - r0 - rows
+                f.seek(offset + file_row * row_bytes)
+                data = f.read(rows * row_bytes)
+                band = Image.frombytes(img.mode, (tile_w, rows), data, 'raw', rawmode, stride, orientation)
+                if palette is not None:
+                    band.putpalette(palette)
+                _accumulate_area(acc, counts, np.asarray(band.convert('RGB')),
+                                 y0 + r0, x0, height, width, size)
+    return np.rint(acc / counts[..., None]).astype(np.uint8)
+
+def load_logo_image(image_path, size=SIZE):
+    """
+    读取图片并缩小为 size×size 的RGB数组
+    
+    普通图片整幅读取后用LANCZOS缩放；超大图片改用低内存方式，峰值内存不随原图尺寸增长：
+    - JPEG：draft 让解码器直接按1/2~1/8比例解码，不生成原尺寸图像
+    - 未压缩的BMP/PPM/TIFF：按行条带逐块读取原始像素并面积平均
+    - PNG、压缩TIFF等无法分块解码的格式仍整幅读取
+    """
+    with Image.open(image_path) as img:
+        if img.width * img.height > LARGE_IMAGE_PIXELS:
+            if img.format == 'JPEG':
+                img.draft('RGB', (size * 2, size * 2))
+            else:
+                array = _reduce_raw_tiles(img, image_path, size)
+                if array is not None:
+                    return array
+        img_resized = img.convert('RGB').resize((size, size), Image.Resampling.LANCZOS)
+    return np.array(img_resized)
+
+def quantize_to_palette(img_array, palette, chunk_rows=64):
+    """
+    将每个像素映射到调色板中最近的颜色（欧氏距离）
+    
+    按行分块计算，中间数组只有 chunk_rows×宽×K 个float32，大图内存也不会上涨。
+    利用 |x-c|² = |x|² - 2x·c + |c|²，其中 |x|² 对所有颜色相同，比较时可以省略。
+    像素值不超过255，float32 可以精确表示所有距离，距离相同时取下标较小的颜色。
     
     参数:
-    image_path: 输入校徽图片路径
-    output_npy_path: 输出.npy文件路径（可选）
+    img_array: H×W×3 的RGB数组
+    palette: K个RGB颜色（K不超过256）
+    chunk_rows: 每块处理的行数
     
     返回:
-    binary_matrix: 128x128的0-1矩阵
+    labels: H×W 的uint8矩阵，值为调色板下标
     """
-    # 定义红色和白色的RGB值
-    RED = np.array([202, 43, 47])
-    WHITE = np.array([255, 255, 255])
+    palette = np.asarray(palette, dtype=np.float32).reshape(-1, 3)
+    if not 1 <= len(palette) <= 256:
+        raise ValueError("调色板颜色数量必须在1到256之间")
+    palette_sq = np.sum(palette ** 2, axis=1)
+    palette_t2 = 2.0 * palette.T
     
-    # 打开图片并转换为RGB模式
-    img = Image.open(image_path).convert('RGB')
+    height, width = img_array.shape[:2]
+    labels = np.empty((height, width), dtype=np.uint8)
+    for start in range(0, height, chunk_rows):
+        block = img_array[start:start + chunk_rows, :, :3].reshape(-1, 3).astype(np.float32)
+        dist = palette_sq - block @ palette_t2
+        labels[start:start + chunk_rows] = dist.argmin(axis=1).reshape(-1, width)
+    return labels
+
+def convert_logo_to_labels(image_path, palette, output_npy_path=None):
+    """
+    将多色校徽图片转换为调色板标签矩阵
     
-    # 调整大小为128x128
-    img_resized = img.resize((SIZE, SIZE), Image.Resampling.LANCZOS)
+    参数:
+    image_path: 输入校徽图片路径
+    palette: K个RGB颜色
+    output_npy_path: 输出.npy文件路径（可选）
     
-    # 转换为numpy数组
-    img_array = np.array(img_resized)
+    返回:
+    labels: SIZE×SIZE 的标签矩阵，值为调色板下标
+    """
+    labels = quantize_to_palette(load_logo_image(image_path), palette)
+    if output_npy_path:
+        np.save(output_npy_path, labels)
+        print(f"标签矩阵已保存到: {output_npy_path}")
+    return labels
+
+def convert_logo_to_matrix(image_path, output_npy_path=None):
+    """
+    将校徽图片转换为128x128的0-1矩阵
     
-    # 计算每个像素到红色和白色的欧氏距离（二阶范数）的平方
-    # 注意：为了效率，我们计算平方距离，因为平方根是单调递增的
-    diff_red = img_array - RED
-    diff_white = img_array - WHITE
+    参数:
+    image_path: 输入校徽图片路径
+    output_npy_path: 输出文件路径（可选，.lgm 为位压缩格式，其余为 .npy）
     
-    # 计算平方距离
-    dist_red_sq = np.sum(diff_red ** 2, axis=2)
-    dist_white_sq = np.sum(diff_white ** 2, axis=2)
+    返回:
+    binary_matrix: 128x128的0-1矩阵
+    """
+    # 打开图片、转换为RGB模式并调整大小为SIZE×SIZE（超大图片使用低内存方式）
+    img_array = load_logo_image(image_path)
     
-    # 比较距离：更接近红色记为1，否则记为0
-    binary_matrix = (dist_red_sq <= dist_white_sq).astype(np.uint8)
+    # 按欧氏距离归入红色或白色：更接近红色记为1，否则记为0（距离相同算红色）
+    labels = quantize_to_palette(img_array, [RED, WHITE])
+    binary_matrix = (labels == 0).astype(np.uint8)
     
-    # 如果需要保存为.npy文件
+    # 如果需要保存为文件（.lgm为位压缩格式，其余保存为.npy）
     if output_npy_path:
-        np.save(output_npy_path, binary_matrix)
+        if output_npy_path.endswith('.lgm'):
+            save_logo_matrix(binary_matrix, output_npy_path)
+        else:
+            np.save(output_npy_path, binary_matrix)
         print(f"矩阵已保存到: {output_npy_path}")
     
     return binary_matrix
@@ -71,44 +197,181 @@ def visualize_matrix(matrix, output_image_path=None):
     
     return img_vis
 
-def batch_process_logos(input_folder, output_folder):
+def conversion_params():
+    """影响转换结果的参数，变化后所有输出都需要重新生成"""
+    return {'size': SIZE, 'red': list(RED), 'white': list(WHITE), 'pyramid': list(PYRAMID_LEVELS)}
+
+def file_hash(path, chunk_size=1 << 20):
+    """计算文件内容的SHA-256"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def load_manifest(manifest_path):
+    """读取构建清单，不存在或损坏时返回空清单"""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_manifest(manifest, manifest_path):
+    """写入临时文件后替换，避免中断时清单损坏"""
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+def output_unchanged(path, recorded):
+    """输出文件仍是清单记录的那一份：先比较大小，一致时再比较哈希"""
+    if not isinstance(recorded, dict):
+        return False
+    try:
+        if os.path.getsize(path) != recorded.get('size'):
+            return False
+    except OSError:
+        return False
+    return file_hash(path) == recorded.get('hash')
+
+def is_up_to_date(manifest, name, source_hash, outputs):
+    """源图片内容与转换参数都未变化，且输出文件未被删除或替换时，无需重新转换"""
+    entry = manifest.get(name)
+    if (entry is None
+            or entry.get('hash') != source_hash
+            or entry.get('params') != conversion_params()):
+        return False
+    # 旧版清单的 outputs 只是文件名列表，视为需要重新转换
+    recorded = entry.get('outputs')
+    if not isinstance(recorded, dict):
+        return False
+    return all(output_unchanged(p, recorded.get(os.path.basename(p))) for p in outputs)
+
+def record_build(manifest, name, source_hash, outputs):
+    """在清单中记录一次成功的转换，包括各输出文件的大小与哈希"""
+    manifest[name] = {'hash': source_hash, 'params': conversion_params(),
+                      'outputs': {os.path.basename(p): {'size': os.path.getsize(p), 'hash': file_hash(p)}
+                                  for p in outputs}}
+
+def process_logo(input_path, npy_output, img_output, pyramid_output=None):
     """
-    批量处理文件夹中的校徽图片
+    处理单个校徽图片，可在工作进程中运行
+
+    返回:
+    result: 结果字典，包含文件名、是否成功、矩阵形状、红色像素比例、耗时和错误信息
+    """
+    start = time.perf_counter()
+    result = {'file': os.path.basename(input_path), 'ok': False, 'skipped': False,
+              'shape': None, 'red_ratio': None, 'seconds': 0.0, 'error': None}
+    try:
+        # 转换图片为矩阵
+        matrix = convert_logo_to_matrix(input_path, npy_output)
+        
+        # 生成可视化图片
+        visualize_matrix(matrix, img_output)
+        
+        # 生成多分辨率金字塔
+        if pyramid_output:
+            save_logo_pyramid(build_logo_pyramid(matrix), pyramid_output)
+        
+        result['ok'] = True
+        result['shape'] = matrix.shape
+        result['red_ratio'] = float(np.sum(matrix) / matrix.size)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def iter_process_logos(input_folder, output_folder, workers=None, force=False):
+    """
+    批量处理文件夹中的校徽图片，按完成顺序逐个产出结果
+    
+    输出文件夹中的构建清单记录了每个源图片的内容哈希与转换参数，
+    未变化且输出齐全的图片直接跳过（结果中 skipped 为 True）。
     
     参数:
     input_folder: 输入图片文件夹
     output_folder: 输出文件夹
+    workers: 进程数，None为CPU核数，1为在当前进程中顺序处理
+    force: 为True时忽略清单，全部重新转换
+    
+    返回:
+    生成器，每处理完一个文件产出一个结果字典（见 process_logo）
     """
     os.makedirs(output_folder, exist_ok=True)
+    manifest_path = os.path.join(output_folder, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
     
     # 支持的图片格式
     image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']
     
-    for filename in os.listdir(input_folder):
+    jobs = []
+    for filename in sorted(os.listdir(input_folder)):
         # 检查文件扩展名
         if any(filename.lower().endswith(ext) for ext in image_extensions):
-            input_path = os.path.join(input_folder, filename)
-            
             # 生成输出文件名
             base_name = os.path.splitext(filename)[0]
-            npy_output = os.path.join(output_folder, f"{base_name}_matrix.npy")
-            img_output = os.path.join(output_folder, f"{base_name}_visualization.png")
-            
-            try:
-                print(f"处理文件: {filename}")
-                # 转换图片为矩阵
-                matrix = convert_logo_to_matrix(input_path, npy_output)
-                
-                # 生成可视化图片
-                visualize_matrix(matrix, img_output)
-                
-                print(f"成功处理: {filename}")
-                print(f"  - 矩阵形状: {matrix.shape}")
-                print(f"  - 红色像素比例: {np.sum(matrix) / (SIZE*SIZE):.2%}")
-                print()
-                
-            except Exception as e:
-                print(f"处理文件 {filename} 时出错: {e}")
+            job = (os.path.join(input_folder, filename),
+                   os.path.join(output_folder, f"{base_name}_matrix.npy"),
+                   os.path.join(output_folder, f"{base_name}_visualization.png"),
+                   os.path.join(output_folder, f"{base_name}_pyramid.npz"))
+            source_hash = file_hash(job[0])
+            if not force and is_up_to_date(manifest, filename, source_hash, job[1:]):
+                yield {'file': filename, 'ok': True, 'skipped': True, 'shape': None,
+                       'red_ratio': None, 'seconds': 0.0, 'error': None}
+            else:
+                jobs.append((filename, source_hash, job))
+    
+    def finish(result, filename, source_hash, job):
+        if result['ok']:
+            record_build(manifest, filename, source_hash, job[1:])
+            save_manifest(manifest, manifest_path)
+        return result
+    
+    if workers == 1 or len(jobs) <= 1:
+        for filename, source_hash, job in jobs:
+            yield finish(process_logo(*job), filename, source_hash, job)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process_logo, *job): (filename, source_hash, job)
+                   for filename, source_hash, job in jobs}
+        for future in as_completed(futures):
+            yield finish(future.result(), *futures[future])
+
+def batch_process_logos(input_folder, output_folder, workers=None, callback=None, force=False):
+    """
+    批量处理文件夹中的校徽图片
+    
+    参数:
+    input_folder: 输入图片文件夹
+    output_folder: 输出文件夹
+    workers: 进程数，None为CPU核数，1为顺序处理
+    callback: 每处理完一个文件调用 callback(result)，为None时打印进度
+    force: 为True时忽略构建清单，全部重新转换
+    
+    返回:
+    results: 全部结果字典列表，失败的文件在 error 中记录原因
+    """
+    results = []
+    for result in iter_process_logos(input_folder, output_folder, workers, force):
+        results.append(result)
+        if callback is not None:
+            callback(result)
+        elif result['skipped']:
+            print(f"未变化，跳过: {result['file']}")
+        elif result['ok']:
+            print(f"成功处理: {result['file']} ({result['seconds']:.2f}s)")
+            print(f"  - 矩阵形状: {result['shape']}")
+            print(f"  - 红色像素比例: {result['red_ratio']:.2%}")
+    
+    failed = [r for r in results if not r['ok']]
+    skipped = sum(1 for r in results if r['skipped'])
+    print(f"共处理 {len(results)} 个文件，跳过 {skipped} 个，失败 {len(failed)} 个")
+    for r in failed:
+        print(f"  - {r['file']}: {r['error']}")
+    return results
 
 # 使用示例
 if __name__ == "__main__":
@@ -116,14 +379,28 @@ if __name__ == "__main__":
     input_image = "xjtulogo.jpg"  # 替换为你的校徽图片路径
     
     if os.path.exists(input_image):
-        # 转换并保存矩阵
-        binary_matrix = convert_logo_to_matrix(
-            image_path=input_image,
-            output_npy_path="logo_matrix.npy"
-        )
-        
-        # 生成可视化图片
-        visualize_matrix(binary_matrix, "logo_visualization.png")
+        outputs = ("logo_matrix.npy", "logo_visualization.png", "logo_pyramid.npz")
+        manifest = load_manifest(MANIFEST_NAME)
+        source_hash = file_hash(input_image)
+        if is_up_to_date(manifest, input_image, source_hash, outputs):
+            # 源图片与参数均未变化，直接使用已有矩阵
+            print(f"{input_image} 未变化，跳过转换")
+            binary_matrix = np.load(outputs[0])
+        else:
+            # 转换并保存矩阵
+            binary_matrix = convert_logo_to_matrix(
+                image_path=input_image,
+                output_npy_path=outputs[0]
+            )
+            
+            # 生成可视化图片
+            visualize_matrix(binary_matrix, outputs[1])
+            
+            # 生成多分辨率金字塔（512/256/128/64），界面按显示尺寸选取最接近的一层
+            save_logo_pyramid(build_logo_pyramid(binary_matrix), outputs[2])
+            print(f"金字塔已保存到: {outputs[2]}")
+            record_build(manifest, input_image, source_hash, outputs)
+            save_manifest(manifest, MANIFEST_NAME)
         
         # 打印一些统计信息
         print(f"矩阵形状: {binary_matrix.shape}")
@@ -139,4 +416,4 @@ if __name__ == "__main__":
         print(f"文件 {input_image} 不存在，请替换为你的校徽图片路径")
     
     # 示例2: 批量处理（如果需要）
-    # batch_process_logos("input_logos", "output_matrices")
\ No newline at end of file
+    # batch_process_logos("input_logos", "output_matrices", workers=4)
\ No newline at end of file
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+性能基准测试
+
+- synthetic: 按真实专业目录与选考科目生成模拟学生记录
+- suite: 按不同记录数计时各热点路径，结果输出为JSON（python -m benchmarks.suite）
+- bench_*.py: 单项对比测试，可直接运行
+"""
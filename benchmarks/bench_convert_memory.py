@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+超大校徽图片转换的峰值内存基准：比较整幅读取与低内存读取（base01.load_logo_image）
+
+每种方式在独立子进程中运行，用 ru_maxrss 统计峰值常驻内存（仅支持Linux/macOS）。
+
+用法:
+python benchmarks/bench_convert_memory.py [边长，默认10000]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 子进程代码：读取图片缩小为512×512后输出峰值内存（KB）
+LEGACY = """
+import numpy as np
+from PIL import Image
+img = Image.open({path!r}).convert('RGB')
+np.array(img.resize((512, 512), Image.Resampling.LANCZOS))
+"""
+STREAMING = """
+import base01
+base01.load_logo_image({path!r})
+"""
+PEAK = """
+import resource, sys
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(peak // 1024 if sys.platform == 'darwin' else peak)
+"""
+BASELINE = """
+import numpy as np
+from PIL import Image
+import base01
+"""
+
+
+def peak_rss_mb(code):
+    result = subprocess.run([sys.executable, '-c', code + PEAK], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return int(result.stdout.split()[-1]) / 1024
+
+
+def make_large_logo(path, side):
+    """由仓库中的校徽放大生成超大图片（在子进程中生成，避免本进程内存计入后续子进程的峰值）"""
+    code = ("from PIL import Image\n"
+            "Image.open('xjtulogo.jpg').convert('RGB')"
+            f".resize(({side}, {side}), Image.Resampling.NEAREST).save({path!r})")
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+
+
+def main():
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    base = peak_rss_mb(BASELINE)
+    print(f"边长 {side}，解释器与依赖基线 {base:.0f} MB")
+    with tempfile.TemporaryDirectory() as tmp:
+        for ext in ('jpg', 'bmp', 'png'):
+            path = os.path.join(tmp, f"logo.{ext}")
+            make_large_logo(path, side)
+            legacy = peak_rss_mb(BASELINE + LEGACY.format(path=path))
+            streaming = peak_rss_mb(BASELINE + STREAMING.format(path=path))
+            print(f"{ext}: 整幅读取 {legacy:.0f} MB, 低内存读取 {streaming:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
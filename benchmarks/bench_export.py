@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+res.xlsx 导出基准：比较原先的 DataFrame + 完整工作簿方式与 openpyxl 只写模式流式导出
+
+每种方式在独立子进程中运行，输出耗时与峰值常驻内存（ru_maxrss，仅支持Linux/macOS）。
+
+用法:
+python benchmarks/bench_export.py [记录数...]，默认 1000 10000 100000
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 子进程代码：打开存储，导出一次，输出 耗时(秒) 峰值内存(KB)
+SETUP = """
+import resource, sys, time
+from store import JsonlRecordStore
+store = JsonlRecordStore({journal!r})
+start = time.perf_counter()
+"""
+LEGACY = """
+import pandas as pd
+from store import records_dataframe
+df = records_dataframe(store)
+with pd.ExcelWriter({output!r}, engine='openpyxl') as writer:
+    df.to_excel(writer, index=True, index_label='序号')
+    ws = writer.book.active
+    for cell in ws[1]:
+        if cell.value == '联系电话':
+            for row in ws.iter_rows(min_row=2, min_col=cell.col_idx, max_col=cell.col_idx):
+                for c in row:
+                    c.number_format = '@'
+"""
+STREAMING = """
+from store import export_workbook
+export_workbook(store, {output!r})
+"""
+PEAK = """
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(elapsed, peak // 1024 if sys.platform == 'darwin' else peak)
+"""
+
+
+def make_journal(path, n):
+    """直接写出 n 条记录的日志"""
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for i in range(1, n + 1):
+            data = {
+                '姓名': f"学生{i}", '所在中学': '青岛五十八中', '联系电话': f"138{i:08d}",
+                '选考科目': '物理、化学、生物', '意向学院': '电信学部', '意向专业': '计算机科学与技术',
+                '最近一次考试分数': 600.5, '总分数': 750.0, '最近一次年级排名': i % 500 + 1,
+                '参加排名人数': 500, '备注': '',
+            }
+            f.write(json.dumps({'op': 'add', 'id': i, 'data': data}, ensure_ascii=False) + '\n')
+    # 预先生成旁路统计，避免计时进程首次打开时重建（在子进程中进行，不抬高本进程内存）
+    subprocess.run([sys.executable, '-c', f"from store import JsonlRecordStore; JsonlRecordStore({path!r})"],
+                   cwd=ROOT, check=True)
+
+
+def run(code):
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    elapsed, peak = result.stdout.split()[-2:]
+    return float(elapsed), int(peak) / 1024
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1:]] or [1000, 10000, 100000]
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            journal = os.path.join(tmp, f"res{n}.jsonl")
+            make_journal(journal, n)
+            output = os.path.join(tmp, f"res{n}.xlsx")
+            for name, body in (('DataFrame', LEGACY), ('只写模式', STREAMING)):
+                code = (SETUP + body + PEAK).format(journal=journal, output=output)
+                elapsed, peak = run(code)
+                print(f"{n} 条 {name}: {elapsed:.2f} s, 峰值内存 {peak:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+校徽渲染基准测试：比较逐像素drawRect与NumPy向量化渲染的耗时
+
+用法:
+python benchmarks/bench_logo.py [logo_matrix.npy] [尺寸...]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PyQt5.QtGui import QColor, QPainter, QPixmap
+from PyQt5.QtWidgets import QApplication
+
+from logo_render import render_logo_pixmap
+
+
+def render_logo_loop(matrix, size):
+    """原先 display_logo 中的逐像素绘制方式"""
+    pixmap = QPixmap(size, size)
+    pixmap.fill(QColor(245, 245, 245))
+    painter = QPainter(pixmap)
+    red_color = QColor(202, 43, 47)
+    scale_x = size / matrix.shape[1]
+    scale_y = size / matrix.shape[0]
+    for i in range(matrix.shape[0]):
+        for j in range(matrix.shape[1]):
+            if matrix[i, j] == 1:
+                x = int(j * scale_x)
+                y = int(i * scale_y)
+                painter.setPen(red_color)
+                painter.setBrush(red_color)
+                painter.drawRect(x, y, max(1, int(scale_x)), max(1, int(scale_y)))
+    painter.end()
+    return pixmap
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    app = QApplication(sys.argv[:1])
+    path = sys.argv[1] if len(sys.argv) > 1 else "logo_matrix.npy"
+    sizes = [int(s) for s in sys.argv[2:]] or [512, 256]
+    matrix = np.load(path)
+    print(f"点阵: {path} {matrix.shape}，红色像素 {int(matrix.sum())} 个")
+    for size in sizes:
+        loop = best_of(lambda: render_logo_loop(matrix, size), 1)
+        vec = best_of(lambda: render_logo_pixmap(matrix, size), 5)
+        print(f"尺寸 {size}: 逐像素 {loop * 1000:.1f} ms, 向量化 {vec * 1000:.2f} ms, 加速 {loop / vec:.0f}x")
+    # 启动时欢迎页与成功页各渲染一次
+    total_loop = 2 * best_of(lambda: render_logo_loop(matrix, 256), 1)
+    total_vec = 2 * best_of(lambda: render_logo_pixmap(matrix, 256), 5)
+    print(f"启动（两个页面，256）: {total_loop * 1000:.1f} ms -> {total_vec * 1000:.2f} ms")
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
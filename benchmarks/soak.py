@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+长时间运行模拟
+
+用 QTest 在 offscreen 平台上驱动真实的 MainWindow：欢迎页点"确认使用"，逐个输入表单、
+在专业弹窗中选择专业、点"确认并导出"，到成功页后点"返回"，循环模拟大量学生。
+记录"点击提交到显示成功页"的延迟分位数，并定期采样常驻内存、控件数量与记录文件大小，
+用于在几分钟内复现现场数小时后才出现的变慢或泄漏。
+
+程序在临时目录（或 --workdir 指定的目录）中运行，不会改动仓库中的 res.jsonl / res.xlsx。
+
+用法:
+python -m benchmarks.soak [--students 2000] [--sample-every 100] [--output soak.json]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import make_student
+
+
+def rss_mb():
+    """当前常驻内存（MB），Linux读取/proc，其他平台退回峰值"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+def percentiles(samples):
+    """延迟样本（秒）的分位数，单位毫秒"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+
+    return {'n': len(samples), 'mean_ms': statistics.fmean(samples) * 1000,
+            'p50_ms': pick(0.50), 'p95_ms': pick(0.95), 'p99_ms': pick(0.99),
+            'max_ms': ordered[-1] * 1000}
+
+
+def file_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def find_button(widget, text):
+    from PyQt5.QtWidgets import QPushButton
+
+    for button in widget.findChildren(QPushButton):
+        if button.text() == text:
+            return button
+    raise LookupError(f"找不到按钮: {text}")
+
+
+class SoakDriver:
+    """驱动主窗口完成一次次提交"""
+    def __init__(self, window, seed=0):
+        from PyQt5.QtCore import QTimer
+        from PyQt5.QtWidgets import QApplication
+
+        self.window = window
+        self.app = QApplication.instance()
+        self.rng = random.Random(seed)
+        self.form = window.form_page
+        self.start_btn = find_button(window.welcome_page, "确认使用")
+        self.submit_btn = find_button(self.form, "确认并导出")
+        self.back_btn = find_button(window.success_page, "返回")
+        self.errors = []
+        # 校验失败等模态提示框会阻塞驱动，定时关闭并记录
+        self._watchdog = QTimer()
+        self._watchdog.timeout.connect(self._close_modal)
+        self._watchdog.start(200)
+
+    def _close_modal(self):
+        from PyQt5.QtWidgets import QMessageBox
+
+        modal = self.app.activeModalWidget()
+        if isinstance(modal, QMessageBox):
+            self.errors.append(modal.text())
+            modal.done(0)
+
+    def _type(self, line_edit, text):
+        from PyQt5.QtGui import QInputMethodEvent
+        from PyQt5.QtTest import QTest
+
+        text = str(text)
+        line_edit.clear()
+        if text.isascii():
+            QTest.keyClicks(line_edit, text)
+        else:
+            # 中文由输入法提交，QTest只能模拟ASCII按键
+            event = QInputMethodEvent()
+            event.setCommitString(text)
+            self.app.sendEvent(line_edit, event)
+
+    def _choose_major(self, college, major):
+        from PyQt5.QtCore import Qt, QTimer
+        from PyQt5.QtTest import QTest
+
+        def choose():
+            dialog = self.form.major_dialog
+            dialog.college_combo.setCurrentText(college)
+            dialog.major_combo.setCurrentText(major)
+            dialog.accept()
+
+        # 弹窗以exec_()模态运行，在其事件循环中完成选择
+        QTimer.singleShot(0, choose)
+        QTest.mouseClick(self.form.major_btn, Qt.LeftButton)
+
+    def submit_one(self):
+        """模拟一位学生，返回提交到显示成功页的耗时（秒）"""
+        from PyQt5.QtCore import Qt
+        from PyQt5.QtTest import QTest
+
+        student = make_student(self.rng)
+        QTest.mouseClick(self.start_btn, Qt.LeftButton)
+        form = self.form
+        self._type(form.name_input, student['姓名'])
+        self._type(form.school_input, student['所在中学'])
+        self._type(form.phone_input, student['联系电话'])
+        for subject in student['选考科目'].split('、'):
+            # 复选框被布局拉宽后中心点可能不在可点击区域，直接模拟一次完整点击
+            form.subject_checkboxes[subject].click()
+        self._choose_major(student['意向学院'], student['意向专业'])
+        self._type(form.score_input, student['最近一次考试分数'])
+        self._type(form.total_score_input, int(student['总分数']))
+        self._type(form.rank_input, student['最近一次年级排名'])
+        self._type(form.total_rank_input, student['参加排名人数'])
+        self._type(form.remark_input, student['备注'])
+
+        start = time.perf_counter()
+        QTest.mouseClick(self.submit_btn, Qt.LeftButton)
+        self.app.processEvents()
+        elapsed = time.perf_counter() - start
+        if self.window.stacked_layout.currentWidget() is not self.window.success_page:
+            # 校验未通过，清空表单回到欢迎页继续
+            form.clear_form()
+            self.window.show_welcome_page()
+            return None
+        QTest.mouseClick(self.back_btn, Qt.LeftButton)
+        return elapsed
+
+
+def run(students, sample_every, workdir, seed=0):
+    """在 workdir 中运行模拟，返回结果字典"""
+    # collect 按当前目录确定数据文件位置，需先切换目录再导入
+    for name in ('logo_matrix.npy', 'major.json'):
+        source = os.path.join(ROOT, name)
+        if os.path.exists(source):
+            shutil.copy2(source, workdir)
+    os.chdir(workdir)
+    import collect
+    from PyQt5.QtWidgets import QApplication
+
+    collect.ensure_catalogue(collect.major_path)
+    collect.migrate_logo()
+    app = QApplication.instance() or QApplication([])
+    window = collect.MainWindow()
+    window.show()
+    driver = SoakDriver(window, seed)
+
+    latencies = []
+    window_latencies = []
+    samples = []
+    failed = 0
+    started = time.perf_counter()
+    rss_start = rss_mb()
+    for i in range(1, students + 1):
+        elapsed = driver.submit_one()
+        if elapsed is None:
+            failed += 1
+        else:
+            latencies.append(elapsed)
+            window_latencies.append(elapsed)
+        if i % sample_every == 0 or i == students:
+            samples.append({
+                'students': i,
+                'elapsed_s': time.perf_counter() - started,
+                'rss_mb': rss_mb(),
+                'widgets': len(app.allWidgets()),
+                'jsonl_bytes': file_size(collect.record_path),
+                'xlsx_bytes': file_size(collect.export_path),
+                **percentiles(window_latencies),
+            })
+            window_latencies = []
+            print(f"{i}/{students} 人, RSS {samples[-1]['rss_mb']:.1f} MB, "
+                  f"p95 {samples[-1].get('p95_ms', 0):.1f} ms", file=sys.stderr)
+
+    window.writer.flush()
+    count = window.store.count()
+    # 先等写入线程导出结束，关闭窗口时无需再等待
+    window.writer.stop()
+    window.close()
+    return {
+        'students': students,
+        'saved': count,
+        'failed': failed,
+        'errors': driver.errors[:20],
+        'seconds': time.perf_counter() - started,
+        'latency': percentiles(latencies),
+        'rss_growth_mb': rss_mb() - rss_start,
+        'samples': samples,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="长时间运行模拟")
+    parser.add_argument('--students', type=int, default=2000, help="模拟的学生人数")
+    parser.add_argument('--sample-every', type=int, default=100, help="每多少人采样一次")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', help="运行目录，默认为临时目录")
+    parser.add_argument('--output', help="结果写入的JSON文件，默认输出到标准输出")
+    args = parser.parse_args(argv)
+
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        result = run(args.students, args.sample_every, os.path.abspath(args.workdir), args.seed)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            result = run(args.students, args.sample_every, workdir, args.seed)
+            os.chdir(ROOT)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+采集热点路径基准测试
+
+在临时目录中按不同记录数（默认 100/1000/10000/100000）生成模拟记录，计时：
+- append: 已有 N 条记录时单条提交的写入延迟（即 SubmissionWriter 每批的落盘开销）
+- open / count: 打开存储与查询人数（SuccessPage.get_student_count）
+- report: 由存储构建数据表并做完整性检查（WelcomePage.check_export）
+- export: 重新生成 res.xlsx
+与记录数无关的项目只测一次：
+- render: 各格式校徽点阵渲染为QPixmap（display_logo），首次与缓存命中
+- convert: base01.convert_logo_to_matrix
+
+Qt 使用 offscreen 平台插件，无显示器的Linux上也可运行。结果以JSON输出，便于比较前后两次的结果。
+
+用法:
+python -m benchmarks.suite [--sizes 100 1000] [--only append export] [--output result.json]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from loguru import logger
+
+from benchmarks.synthetic import fill_store, generate_students
+from store import JsonlRecordStore, export_workbook, records_dataframe
+
+SIZES = [100, 1000, 10000, 100000]
+SIZED = ['append', 'open', 'count', 'report', 'export']
+FIXED = ['render', 'convert']
+
+# QPixmap 需要 QApplication 存活
+_app = None
+
+
+def summarize(samples):
+    """耗时样本（秒）的统计，单位毫秒"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {'n': len(samples), 'mean_ms': statistics.fmean(samples) * 1000,
+            'p50_ms': statistics.median(samples) * 1000, 'p95_ms': p95 * 1000,
+            'max_ms': ordered[-1] * 1000}
+
+
+def timed(func, repeat=1):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_store(n, workdir, only):
+    """对含 n 条记录的存储计时各项"""
+    path = os.path.join(workdir, f"res{n}.jsonl")
+    store = JsonlRecordStore(path)
+    start = time.perf_counter()
+    fill_store(store, n)
+    results = [{'name': 'fill', 'records': n, **summarize([time.perf_counter() - start])}]
+
+    if 'append' in only:
+        extra = list(generate_students(50, seed=n))
+        samples = []
+        for student in extra:
+            t = time.perf_counter()
+            store.append(student)
+            samples.append(time.perf_counter() - t)
+        results.append({'name': 'append', 'records': n, **summarize(samples)})
+    store.close()
+
+    if 'open' in only:
+        stores = []
+        results.append({'name': 'open', 'records': n,
+                        **timed(lambda: stores.append(JsonlRecordStore(path)), repeat=5)})
+        for s in stores:
+            s.close()
+    store = JsonlRecordStore(path)
+    if 'count' in only:
+        results.append({'name': 'count', 'records': n, **timed(store.count, repeat=1000)})
+    if 'report' in only:
+        from report import check_records, format_report
+        results.append({'name': 'report', 'records': n,
+                        **timed(lambda: format_report(check_records(records_dataframe(store))))})
+    if 'export' in only:
+        output = os.path.join(workdir, f"res{n}.xlsx")
+        results.append({'name': 'export', 'records': n,
+                        **timed(lambda: export_workbook(store, output))})
+    store.close()
+    return results
+
+
+def bench_render(workdir):
+    """各格式校徽点阵渲染：首次（清空缓存）与缓存命中"""
+    import numpy as np
+    from PyQt5.QtWidgets import QApplication
+
+    import pixmap_cache
+    from logo_format import build_logo_pyramid, save_logo_matrix, save_logo_pyramid
+
+    global _app
+    _app = QApplication.instance() or QApplication([])
+    matrix = np.load(os.path.join(ROOT, 'logo_matrix.npy'))
+    paths = {'npy': os.path.join(workdir, 'logo_matrix.npy'),
+             'lgm': os.path.join(workdir, 'logo_matrix.lgm'),
+             'pyramid': os.path.join(workdir, 'logo_pyramid.npz')}
+    np.save(paths['npy'], matrix)
+    save_logo_matrix(matrix, paths['lgm'])
+    save_logo_pyramid(build_logo_pyramid(matrix), paths['pyramid'])
+
+    results = []
+    for fmt, path in paths.items():
+        for size in (512, 256):
+            def cold():
+                pixmap_cache.clear()
+                pixmap_cache.get_logo_pixmap(path, size)
+            results.append({'name': 'render', 'format': fmt, 'size': size, 'cache': 'cold',
+                            **timed(cold, repeat=10)})
+            results.append({'name': 'render', 'format': fmt, 'size': size, 'cache': 'warm',
+                            **timed(lambda: pixmap_cache.get_logo_pixmap(path, size), repeat=100)})
+    pixmap_cache.clear()
+    return results
+
+
+def bench_convert(workdir):
+    from base01 import convert_logo_to_matrix
+
+    output = os.path.join(workdir, 'convert.npy')
+    image = os.path.join(ROOT, 'xjtulogo.jpg')
+    # convert_logo_to_matrix 会打印保存路径，转到标准错误以免混入JSON输出
+    with contextlib.redirect_stdout(sys.stderr):
+        stats = timed(lambda: convert_logo_to_matrix(image, output), repeat=3)
+    return [{'name': 'convert', 'file': 'xjtulogo.jpg', **stats}]
+
+
+def run(sizes=SIZES, only=SIZED + FIXED):
+    """运行基准测试，返回结果字典"""
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        if any(name in only for name in SIZED):
+            for n in sizes:
+                results += bench_store(n, workdir, only)
+                print(f"{n} 条记录完成", file=sys.stderr)
+        if 'render' in only:
+            results += bench_render(workdir)
+        if 'convert' in only:
+            results += bench_convert(workdir)
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="采集热点路径基准测试")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="记录数")
+    parser.add_argument('--only', nargs='+', choices=SIZED + FIXED, default=SIZED + FIXED,
+                        help="只运行指定项目")
+    parser.add_argument('--output', help="结果写入的JSON文件，默认输出到标准输出")
+    args = parser.parse_args(argv)
+
+    # 存储与导出的info日志对基准测试没有意义，关闭
+    logger.remove()
+    data = run(args.sizes, args.only)
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
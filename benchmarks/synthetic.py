@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+模拟学生记录生成
+
+字段与 FormPage.submit_form 提交的 student_data 一致，学院与专业取自内置专业目录，
+选考科目为六选三；给定种子时结果可复现。
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalogue import DEFAULT_CATALOGUE
+from store import SUBJECTS
+
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗"
+GIVEN_NAMES = "子涵浩然欣怡梓轩雨萱宇航思远佳琪俊杰诗雨明轩若曦"
+SCHOOLS = ["青岛五十八中", "青岛二中", "青岛一中", "青岛九中"]
+
+
+def make_student(rng, catalogue=DEFAULT_CATALOGUE):
+    """生成一条模拟的 student_data"""
+    college = rng.choice(list(catalogue))
+    total_rank = rng.randint(300, 1200)
+    total_score = rng.choice([750.0, 150.0, 100.0])
+    return {
+        '姓名': rng.choice(SURNAMES) + ''.join(rng.sample(GIVEN_NAMES, rng.randint(1, 2))),
+        '所在中学': rng.choice(SCHOOLS),
+        '联系电话': f"1{rng.choice('3589')}{rng.randrange(10 ** 9):09d}",
+        '选考科目': '、'.join(sorted(rng.sample(SUBJECTS, 3), key=SUBJECTS.index)),
+        '意向学院': college,
+        '意向专业': rng.choice(catalogue[college]),
+        '最近一次考试分数': round(rng.uniform(0.5, 0.98) * total_score, 1),
+        '总分数': total_score,
+        '最近一次年级排名': rng.randint(1, total_rank),
+        '参加排名人数': total_rank,
+        '备注': rng.choice(['', '', '', '希望了解奖学金', '家长陪同']),
+    }
+
+
+def generate_students(n, seed=0, catalogue=DEFAULT_CATALOGUE):
+    """逐条生成 n 条模拟记录"""
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield make_student(rng, catalogue)
+
+
+def fill_store(store, n, seed=0, batch_size=10000):
+    """向记录存储批量写入 n 条模拟记录（每批一次落盘）"""
+    batch = []
+    for student in generate_students(n, seed):
+        batch.append(student)
+        if len(batch) == batch_size:
+            store.append_many(batch)
+            batch = []
+    if batch:
+        store.append_many(batch)
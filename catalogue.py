@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+专业目录
+
+专业目录以 major.json（学院 -> 专业列表）为唯一来源，也可以再合并 majors/ 目录下
+按学校拆分的多个 json 文件。读取时先校验格式，再把结果编译为 pickle 缓存，
+以各源文件的修改时间和大小为键，源文件未变时启动直接读缓存，不再解析json。
+运行中修改目录文件由 catalogue_watcher 监视并热加载，无需重启。
+交给界面的是只读结构：MappingProxyType 包装的 学院 -> 专业元组，字符串均已驻留。
+"""
+import json
+import os
+import pickle
+import shutil
+import sys
+from types import MappingProxyType
+
+from loguru import logger
+
+# 缓存格式版本，缓存结构变化时递增
+CACHE_VERSION = 1
+
+# 内置的默认专业目录，major.json 不存在时据此生成
+DEFAULT_CATALOGUE = {
+    "管理学院":["大数据管理与应用","工商管理","工业工程","会计学（ACCA）"],
+    "联合设计与创新学院":["工业设计","建筑学"],
+    "经金学院":["金融工程","金融学","贸易经济（数字经济方向）","财政学","经济统计学","经济学","电子商务","国际经济与贸易"],
+    "电气学院":["能源互联网工程","电气工程及其自动化"],
+    "电信学部":["软件工程","计算机科学与技术","自动化","网络空间安全","电子科学与技术","物联网工程","微电子科学与工程","信息工程"],
+    "钱学森学院":["储能科学与工程（新工科卓越计划）","计算机科学与技术（国家拔尖计划）","自动化（钱学森班本研一体）","能源与动力工程（钱学森班本研一体）","物理学（国家拔尖计划）","智能制造工程（钱学森班本研一体）","数学与应用数学（国家拔尖计划）","工程力学（国家拔尖计划）","少年班","基础医学（国家拔尖计划）","人工智能（新工科卓越计划）","临床医学（侯宗濂班本研一体）"],
+    "马克思主义学院":["马克思主义理论"],
+    "生命学院":["生物技术","生物医学工程"],
+    "航天学院":["飞行器设计与工程","飞行器动力工程","工程力学"],
+    "能动学院":["能源与动力工程（热流国际班）","能源与动力工程","环境工程","核工程与核技术","新能源科学与工程"],
+    "化工学院":["化学工程与工艺","过程装备与控制工程"],
+    "医学部":["药学","法医学","护理学","基础医学","口腔医学","医工学","制药工程","临床药学","临床医学（5+3一体化）","临床医学","预防医学"],
+    "化学学院":["应用化学","化学"],
+    "公管学院":["行政管理","劳动与社会保障"],
+    "仪器学院":["测控技术与仪器"],
+    "人文学院":["社会学","环境设计","汉语言文学","哲学","书法学"],
+    "机械学院":["工业设计","车辆工程","机械工程（3D打印国际班）","机械工程","智能制造工程"],
+    "物理学院":["材料物理","应用物理学","光电信息科学与工程"],
+    "法学院":["法学","国际经贸规则"],
+    "材料学院":["材料科学与工程"],
+    "人居学院":["人居环境科学与技术"],
+    "新闻学院":["网络与新媒体"],
+    "数学学院":["统计学","数学与应用数学","信息与计算科学"],
+    "外语学院":["英语（语言数据科学方向）","英语（英德方向）","英语","法语","日语（日英方向）","日语"]
+}
+
+
+class CatalogueError(ValueError):
+    """专业目录文件格式错误"""
+
+
+def validate_catalogue(data, source='专业目录'):
+    """
+    校验并规范化专业目录
+
+    参数:
+    data: json解析结果，应为 {学院: [专业, ...]}
+    source: 出错时提示的来源
+
+    返回:
+    {学院: (专业, ...)}，去除首尾空白与同一学院内的重复专业，保持原有顺序
+    """
+    if not isinstance(data, dict):
+        raise CatalogueError(f"{source}: 顶层应为 学院 -> 专业列表 的对象")
+    catalogue = {}
+    for college, majors in data.items():
+        name = college.strip() if isinstance(college, str) else ''
+        if not name:
+            raise CatalogueError(f"{source}: 学院名称不能为空")
+        if not isinstance(majors, list) or not majors:
+            raise CatalogueError(f"{source}: 学院 {name} 的专业应为非空列表")
+        cleaned = []
+        for major in majors:
+            if not isinstance(major, str) or not major.strip():
+                raise CatalogueError(f"{source}: 学院 {name} 含有无效的专业名称: {major!r}")
+            if major.strip() not in cleaned:
+                cleaned.append(major.strip())
+        catalogue[name] = tuple(cleaned)
+    return catalogue
+
+
+def merge_catalogues(catalogues):
+    """按顺序合并多个目录，同名学院的专业取并集"""
+    merged = {}
+    for catalogue in catalogues:
+        for college, majors in catalogue.items():
+            existing = merged.get(college, ())
+            merged[college] = existing + tuple(m for m in majors if m not in existing)
+    return merged
+
+
+def freeze(catalogue):
+    """转为只读结构，学院与专业名称驻留后在各处共享同一个字符串对象"""
+    return MappingProxyType({
+        sys.intern(college): tuple(sys.intern(m) for m in majors)
+        for college, majors in catalogue.items()
+    })
+
+
+def source_signature(paths):
+    """各源文件的路径、修改时间与大小，用作缓存键，也用于判断目录文件是否变化"""
+    return CACHE_VERSION, tuple(
+        (os.path.abspath(p), os.stat(p).st_mtime_ns, os.stat(p).st_size) for p in paths
+    )
+
+
+def default_cache_path(path):
+    return os.path.splitext(path)[0] + '.catalogue.pickle'
+
+
+def _read_cache(cache_path, key):
+    try:
+        with open(cache_path, 'rb') as f:
+            cached_key, catalogue = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"专业目录缓存 {cache_path} 无法读取，重新编译: {e}")
+        return None
+    return catalogue if cached_key == key else None
+
+
+def _write_cache(cache_path, key, catalogue):
+    # 缓存写入失败（如安装目录只读）不影响使用，下次启动重新解析即可
+    tmp_path = cache_path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((key, catalogue), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"写入专业目录缓存失败: {e}")
+
+
+def load_catalogue(paths, cache_path=None):
+    """
+    读取专业目录，源文件未变时直接使用编译缓存
+
+    参数:
+    paths: 单个json路径，或按顺序合并的多个路径
+    cache_path: 缓存文件路径，默认与第一个源文件同名（.catalogue.pickle）
+
+    返回:
+    只读的 {学院: (专业, ...)}
+
+    异常:
+    源文件缺失、无法解析或格式错误时抛出 OSError / CatalogueError
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    if cache_path is None:
+        cache_path = default_cache_path(paths[0])
+    key = source_signature(paths)
+    catalogue = _read_cache(cache_path, key)
+    if catalogue is None:
+        parts = []
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                try:
+                    data = json.load(f)
+                except json.JSONDecodeError as e:
+                    raise CatalogueError(f"{path}: 不是有效的json: {e}") from e
+            parts.append(validate_catalogue(data, path))
+        catalogue = merge_catalogues(parts)
+        _write_cache(cache_path, key, catalogue)
+        logger.info(f"已编译专业目录: {len(catalogue)} 个学院，来源 {', '.join(paths)}")
+    return freeze(catalogue)
+
+
+def diff_catalogues(old, new):
+    """
+    比较两个目录
+
+    返回:
+    (新增的 (学院, 专业) 列表, 移除的 (学院, 专业) 列表)，各按所在目录的顺序
+    """
+    old_pairs = {(c, m) for c, majors in old.items() for m in majors}
+    new_pairs = {(c, m) for c, majors in new.items() for m in majors}
+    added = [(c, m) for c, majors in new.items() for m in majors if (c, m) not in old_pairs]
+    removed = [(c, m) for c, majors in old.items() for m in majors if (c, m) not in new_pairs]
+    return added, removed
+
+
+def catalogue_sources(path, extra_dir=None):
+    """主目录文件，以及 extra_dir 下按文件名排序的各校 json 文件"""
+    sources = [path]
+    if extra_dir and os.path.isdir(extra_dir):
+        sources += [os.path.join(extra_dir, name) for name in sorted(os.listdir(extra_dir))
+                    if name.lower().endswith('.json')]
+    return sources
+
+
+def ensure_catalogue(path, template=None):
+    """
+    major.json 不存在时生成一份，返回是否新建
+
+    参数:
+    path: 操作员编辑的 major.json
+    template: 打包进程序的 major.json，存在时复制它，否则写入内置的默认目录
+    """
+    if os.path.exists(path):
+        return False
+    tmp_path = path + '.tmp'
+    if template and os.path.exists(template) and os.path.abspath(template) != os.path.abspath(path):
+        shutil.copyfile(template, tmp_path)
+    else:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(DEFAULT_CATALOGUE, f, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, path)
+    logger.info(f"已生成默认专业目录: {path}")
+    return True
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+专业目录热加载
+
+监视 major.json、majors/ 目录及其所在目录，文件变化后稍等片刻（编辑器保存时可能
+连续触发多次），在后台线程重新读取并与当前目录比较，再通过信号把新的只读目录和
+新增/移除的条目交给界面线程替换。编辑器"写临时文件再重命名"的保存方式会使被监视
+的文件从监视列表中消失，因此同时监视所在目录，每次检查时重新加入。
+"""
+import os
+
+from loguru import logger
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QThread, QTimer, pyqtSignal
+
+from catalogue import catalogue_sources, diff_catalogues, load_catalogue, source_signature
+
+
+class _ReloadThread(QThread):
+    """在后台读取并比较专业目录"""
+    loaded = pyqtSignal(object, object, list, list)    # 源文件签名, 新目录, 新增, 移除
+    error = pyqtSignal(object, str)                     # 源文件签名, 失败原因
+
+    def __init__(self, sources, signature, current, parent=None):
+        super().__init__(parent)
+        self.sources = sources
+        self.signature = signature
+        self.current = current
+
+    def run(self):
+        try:
+            catalogue = load_catalogue(self.sources)
+        except Exception as e:
+            self.error.emit(self.signature, str(e))
+            return
+        added, removed = diff_catalogues(self.current, catalogue)
+        self.loaded.emit(self.signature, catalogue, added, removed)
+
+
+class CatalogueWatcher(QObject):
+    """专业目录文件的监视器"""
+    changed = pyqtSignal(object, list, list)    # 新目录, 新增的 (学院, 专业), 移除的 (学院, 专业)
+
+    def __init__(self, path, extra_dir, catalogue, delay_ms=500, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.extra_dir = extra_dir
+        self.catalogue = catalogue
+        self._signature = self._current_signature()
+        self._thread = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self._check)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._schedule)
+        self._watcher.directoryChanged.connect(self._schedule)
+        self._watch()
+
+    def _sources(self):
+        return catalogue_sources(self.path, self.extra_dir)
+
+    def _current_signature(self):
+        try:
+            return source_signature(self._sources())
+        except OSError:
+            # 保存过程中文件可能暂时不存在，等下一次变化
+            return None
+
+    def _watch(self):
+        """把存在但尚未监视的路径加入监视"""
+        candidates = self._sources() + [os.path.dirname(os.path.abspath(self.path)), self.extra_dir]
+        watched = set(self._watcher.files()) | set(self._watcher.directories())
+        missing = [p for p in candidates if p and os.path.exists(p) and p not in watched]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def _schedule(self, _path=None):
+        self._timer.start()
+
+    def _check(self):
+        self._watch()
+        if self._thread is not None:
+            # 上一次读取尚未完成，稍后再检查
+            self._timer.start()
+            return
+        signature = self._current_signature()
+        if signature is None or signature == self._signature:
+            return
+        self._thread = _ReloadThread(self._sources(), signature, self.catalogue, self)
+        self._thread.loaded.connect(self._on_loaded)
+        self._thread.error.connect(self._on_error)
+        self._thread.finished.connect(self._on_finished)
+        self._thread.start()
+
+    def _on_loaded(self, signature, catalogue, added, removed):
+        self._signature = signature
+        if list(catalogue.items()) == list(self.catalogue.items()):
+            return
+        self.catalogue = catalogue
+        logger.info(f"专业目录已更新: 新增 {len(added)} 个专业，移除 {len(removed)} 个专业")
+        self.changed.emit(catalogue, added, removed)
+
+    def _on_error(self, signature, message):
+        # 记下签名，文件再次修改前不重复尝试，继续使用当前目录
+        self._signature = signature
+        logger.warning(f"专业目录重新加载失败，继续使用当前目录: {message}")
+
+    def _on_finished(self):
+        self._thread.deleteLater()
+        self._thread = None
+
+    def stop(self):
+        """停止监视并等待正在进行的读取结束"""
+        self._timer.stop()
+        paths = self._watcher.files() + self._watcher.directories()
+        if paths:
+            self._watcher.removePaths(paths)
+        if self._thread is not None:
+            self._thread.wait()
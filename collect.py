@@ -1,19 +1,43 @@
 import sys
 import os
+
+# 导入耗时统计（设置环境变量 COLLECT_IMPORT_PROFILE=1 开启），需在其他导入之前安装
+import import_profile
+if os.environ.get(import_profile.ENV_FLAG):
+    import_profile.install()
+
+import time
 import numpy as np
-import pandas as pd
-import json
-from PyQt5.QtWidgets import *
-from PyQt5.QtCore import *
-from PyQt5.QtGui import *
+from PyQt5.QtCore import QStringListModel, Qt, QThread, QTimer, pyqtSignal
+from PyQt5.QtGui import QDoubleValidator, QFont, QIntValidator
+from PyQt5.QtWidgets import (QApplication, QCheckBox, QComboBox, QCompleter, QDialog,
+                             QFormLayout, QHBoxLayout, QLabel, QLineEdit, QListWidget,
+                             QListWidgetItem, QMainWindow, QMessageBox, QProgressDialog,
+                             QPushButton, QStackedLayout, QVBoxLayout, QWidget)
 
-# 兼容PyInstaller打包路径
+# 兼容PyInstaller打包路径：打包进程序的只读文件位于 sys._MEIPASS，
+# 单文件版每次启动都解压到新的临时目录，生成的缓存文件须写到程序所在目录才能保留
 if hasattr(sys, '_MEIPASS'):
     base_path = sys._MEIPASS
+    data_path = os.path.dirname(os.path.abspath(sys.executable))
 else:
-    base_path = os.path.abspath(".")
-logo_path = os.path.join(base_path, "logo_matrix.npy")
-major_path = os.path.join(base_path, "major.json")
+    base_path = data_path = os.path.abspath(".")
+
+
+def resolve_input(name):
+    """程序目录中的文件优先（安装器会复制一份），否则使用打包进程序的只读副本"""
+    path = os.path.join(data_path, name)
+    return path if os.path.exists(path) else os.path.join(base_path, name)
+
+
+logo_path = resolve_input("logo_matrix.npy")
+# 位压缩格式的校徽点阵与多分辨率金字塔，存在时优先使用（由程序生成，写在程序目录）
+packed_logo_path = os.path.join(data_path, "logo_matrix.lgm")
+pyramid_path = os.path.join(data_path, "logo_pyramid.npz")
+# 专业目录由操作员编辑并热加载，编译缓存也写在同一目录，因此都位于程序目录
+major_path = os.path.join(data_path, "major.json")
+# 按学校拆分的专业目录，存在时与major.json合并
+major_dir = os.path.join(data_path, "majors")
 
 # 日志系统集成
 import os
@@ -27,8 +51,73 @@ log_file = os.path.join(log_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.lo
 
 # 移除loguru默认的控制台输出
 logger.remove()
-# 添加文件日志输出
-logger.add(log_file, encoding="utf-8", rotation="10 MB", retention="10 days", enqueue=True)
+# 添加文件日志输出（耗时记录写入单独的文件）
+import metrics
+from metrics import span
+logger.add(log_file, encoding="utf-8", rotation="10 MB", retention="10 days", enqueue=True,
+           filter=metrics.exclude_metrics)
+metrics.configure(log_dir)
+
+from catalogue import DEFAULT_CATALOGUE, catalogue_sources, ensure_catalogue, freeze, load_catalogue
+from catalogue_watcher import CatalogueWatcher
+from logo_format import (build_logo_pyramid, is_valid_pyramid, load_logo_matrix, migrate_logo_matrix,
+                         save_logo_pyramid)
+from major_index import get_index, update_index
+from pixmap_cache import get_logo_pixmap
+from record_index import RecordIndex, is_ascii_digits, is_phone, normalize_name, phone_key
+from store import SUBJECTS, JsonlRecordStore, import_workbook, records_dataframe
+from writer import SubmissionWriter
+
+# 学生记录：res.jsonl 为追加写入的主存储，res.xlsx 为按需生成的导出文件
+record_path = 'res.jsonl'
+export_path = 'res.xlsx'
+
+def current_logo_path():
+    """依次优先使用金字塔、位压缩格式的校徽点阵，都不存在时使用旧版 .npy"""
+    # 没有任何层级的金字塔（旧版本对非2的幂尺寸生成的）不使用
+    if os.path.exists(pyramid_path) and is_valid_pyramid(pyramid_path):
+        return pyramid_path
+    if os.path.exists(packed_logo_path):
+        return packed_logo_path
+    return logo_path
+
+
+def is_outdated(target, source):
+    """目标文件不存在或早于源文件"""
+    return not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(source)
+
+
+def migrate_logo():
+    """将旧版 logo_matrix.npy 自动迁移为位压缩格式，并补齐多分辨率金字塔"""
+    if os.path.exists(logo_path) and is_outdated(packed_logo_path, logo_path):
+        try:
+            migrate_logo_matrix(logo_path, packed_logo_path)
+            logger.info(f"已将 {logo_path} 迁移为位压缩格式: {packed_logo_path}")
+        except Exception as e:
+            logger.warning(f"迁移校徽点阵失败，继续使用 {logo_path}: {e}")
+    source = packed_logo_path if os.path.exists(packed_logo_path) else logo_path
+    if os.path.exists(source) and (is_outdated(pyramid_path, source) or not is_valid_pyramid(pyramid_path)):
+        try:
+            save_logo_pyramid(build_logo_pyramid(load_logo_matrix(source)), pyramid_path)
+            logger.info(f"已生成校徽金字塔: {pyramid_path}")
+        except Exception as e:
+            logger.warning(f"生成校徽金字塔失败: {e}")
+
+
+class MajorCompleter(QCompleter):
+    """按专业搜索索引给出排序后的候选，支持拼音和首字母"""
+    def __init__(self, index, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.results = QStringListModel(self)
+        self.setModel(self.results)
+        self.setCompletionMode(QCompleter.PopupCompletion)
+
+    def splitPath(self, path):
+        # 候选由索引计算好，返回空前缀让QCompleter不再二次过滤
+        self.results.setStringList(self.index.search(path))
+        return [""]
+
 
 class MajorSelectDialog(QDialog):
     """意向专业选择弹窗"""
@@ -46,7 +135,7 @@ class MajorSelectDialog(QDialog):
         # 兼容PyQt5，QEvent.ContextHelp 可能不存在，直接用整数163判断
         # 163为QEvent.ContextHelp的实际值
         if e.type() == 163:
-            QMessageBox.information(self, "操作说明", "1. 先选择学院，再选择专业，或直接输入‘学院-专业’进行搜索。\n2. 选择后点击‘确认’。\n3. 鼠标悬停可高亮选项。")
+            QMessageBox.information(self, "操作说明", "1. 先选择学院，再选择专业，或直接输入‘学院-专业’、拼音或拼音首字母进行搜索。\n2. 选择后点击‘确认’。\n3. 鼠标悬停可高亮选项。")
             return True
         return super().event(e)
 
@@ -103,14 +192,8 @@ class MajorSelectDialog(QDialog):
         self.major_combo.setEditable(True)
         self.major_combo.setInsertPolicy(QComboBox.NoInsert)
 
-        # 搜索功能
-        all_major_pairs = []
-        for college, majors in self.major_data.items():
-            for major in majors:
-                all_major_pairs.append(f"{college}-{major}")
-        completer = QCompleter(all_major_pairs)
-        completer.setCompletionMode(QCompleter.PopupCompletion)
-        completer.setFilterMode(Qt.MatchContains)
+        # 搜索功能（支持中文、拼音全拼及首字母）
+        completer = MajorCompleter(get_index(self.major_data), self)
         self.major_combo.setCompleter(completer)
 
         self.college_combo.currentTextChanged.connect(self.update_majors)
@@ -149,6 +232,13 @@ class MajorSelectDialog(QDialog):
                 self.college_combo.setCurrentText(college)
                 self.major_combo.setCurrentText(major)
 
+    def reset(self):
+        """清空上一位学生的选择，复用弹窗时只需调用此方法"""
+        self.selected_college = None
+        self.selected_major = None
+        self.college_combo.setCurrentIndex(0)
+        self.update_majors(self.college_combo.currentText())
+
     def get_selection(self):
         college = self.college_combo.currentText()
         major = self.major_combo.currentText()
@@ -157,32 +247,218 @@ class MajorSelectDialog(QDialog):
         return college, major
 
 
-major_dict = {
-    "管理学院":["大数据管理与应用","工商管理","工业工程","会计学（ACCA）"],
-    "联合设计与创新学院":["工业设计","建筑学"],
-    "经金学院":["金融工程","金融学","贸易经济（数字经济方向）","财政学","经济统计学","经济学","电子商务","国际经济与贸易"],
-    "电气学院":["能源互联网工程","电气工程及其自动化"],
-    "电信学部":["软件工程","计算机科学与技术","自动化","网络空间安全","电子科学与技术","物联网工程","微电子科学与工程","信息工程"],
-    "钱学森学院":["储能科学与工程（新工科卓越计划）","计算机科学与技术（国家拔尖计划）","自动化（钱学森班本研一体）","能源与动力工程（钱学森班本研一体）","物理学（国家拔尖计划）","智能制造工程（钱学森班本研一体）","数学与应用数学（国家拔尖计划）","工程力学（国家拔尖计划）","少年班","基础医学（国家拔尖计划）","人工智能（新工科卓越计划）","临床医学（侯宗濂班本研一体）"],
-    "马克思主义学院":["马克思主义理论"],
-    "生命学院":["生物技术","生物医学工程"],
-    "航天学院":["飞行器设计与工程","飞行器动力工程","工程力学"],
-    "能动学院":["能源与动力工程（热流国际班）","能源与动力工程","环境工程","核工程与核技术","新能源科学与工程"],
-    "化工学院":["化学工程与工艺","过程装备与控制工程"],
-    "医学部":["药学","法医学","护理学","基础医学","口腔医学","医工学","制药工程","临床药学","临床医学（5+3一体化）","临床医学","预防医学"],
-    "化学学院":["应用化学","化学"],
-    "公管学院":["行政管理","劳动与社会保障"],
-    "仪器学院":["测控技术与仪器"],
-    "人文学院":["社会学","环境设计","汉语言文学","哲学","书法学"],
-    "机械学院":["工业设计","车辆工程","机械工程（3D打印国际班）","机械工程","智能制造工程"],
-    "物理学院":["材料物理","应用物理学","光电信息科学与工程"],
-    "法学院":["法学","国际经贸规则"],
-    "材料学院":["材料科学与工程"],
-    "人居学院":["人居环境科学与技术"],
-    "新闻学院":["网络与新媒体"],
-    "数学学院":["统计学","数学与应用数学","信息与计算科学"],
-    "外语学院":["英语（语言数据科学方向）","英语（英德方向）","英语","法语","日语（日英方向）","日语"]
-}
+class RecordAdminDialog(QDialog):
+    """记录管理弹窗：按姓名、手机号或序号查找已登记的记录，修改单条记录"""
+    # 编辑区的字段，选考科目以"、"分隔填写
+    TEXT_FIELDS = ['姓名', '所在中学', '联系电话', '选考科目', '意向学院', '意向专业',
+                   '最近一次考试分数', '总分数', '最近一次年级排名', '参加排名人数', '备注']
+
+    def __init__(self, main_window, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("记录管理")
+        self.setMinimumSize(900, 800)
+        self.main_window = main_window
+        self.record_id = None
+        self.record = None
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        layout.setSpacing(15)
+
+        # 查找
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("输入姓名、手机号或序号")
+        self.search_input.setStyleSheet("padding: 10px; font-size: 20px;")
+        self.search_input.returnPressed.connect(self.search)
+        search_btn = QPushButton("查找")
+        search_btn.setStyleSheet("font-size: 20px; padding: 10px 40px;")
+        search_btn.clicked.connect(self.search)
+        search_layout.addWidget(self.search_input)
+        search_layout.addWidget(search_btn)
+        layout.addLayout(search_layout)
+
+        self.result_list = QListWidget()
+        self.result_list.setStyleSheet("font-size: 20px;")
+        self.result_list.setMaximumHeight(200)
+        self.result_list.currentItemChanged.connect(self.show_record)
+        layout.addWidget(self.result_list)
+
+        # 编辑区
+        form_layout = QFormLayout()
+        form_layout.setLabelAlignment(Qt.AlignRight)
+        form_layout.setSpacing(10)
+        self.inputs = {}
+        for field in self.TEXT_FIELDS:
+            line_edit = QLineEdit()
+            line_edit.setStyleSheet("padding: 6px; font-size: 20px;")
+            line_edit.setEnabled(False)
+            self.inputs[field] = line_edit
+            form_layout.addRow(QLabel(f"{field}："), line_edit)
+        self.inputs['最近一次考试分数'].setValidator(QDoubleValidator())
+        self.inputs['总分数'].setValidator(QDoubleValidator())
+        self.inputs['最近一次年级排名'].setValidator(QIntValidator())
+        self.inputs['参加排名人数'].setValidator(QIntValidator())
+        layout.addLayout(form_layout)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.setSpacing(30)
+        self.save_btn = QPushButton("保存修改")
+        self.save_btn.setStyleSheet("font-size: 20px; padding: 10px 40px;")
+        self.save_btn.setEnabled(False)
+        self.save_btn.clicked.connect(self.save)
+        close_btn = QPushButton("关闭")
+        close_btn.setStyleSheet("font-size: 20px; padding: 10px 40px;")
+        close_btn.clicked.connect(self.reject)
+        btn_layout.addWidget(self.save_btn)
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+
+        self.setLayout(layout)
+
+    def find_records(self, query):
+        """
+        查找记录
+
+        参数:
+        query: 姓名、手机号或序号
+
+        返回:
+        [(序号, 记录), ...]
+        """
+        store = self.main_window.store
+        ids = self.main_window.record_index.lookup(query)
+        # 较短的纯数字按序号查找
+        record_number = int(query) if is_ascii_digits(query) and len(query) <= 6 else None
+        if record_number is not None:
+            ids = sorted(set(ids) | {record_number})
+        name, phone = normalize_name(query), phone_key(query)
+        found = []
+        for record_id in ids:
+            record = store.get(record_id)
+            if record is None:
+                continue
+            # 姓名按CRC32索引，可能碰撞，逐条核对
+            if (record_id == record_number
+                    or normalize_name(record.get('姓名')) == name
+                    or (phone is not None and phone_key(record.get('联系电话')) == phone)):
+                found.append((record_id, record))
+        return found
+
+    def search(self):
+        query = self.search_input.text().strip()
+        self.result_list.clear()
+        self.clear_record()
+        if not query:
+            return
+        with span('admin_search'):
+            found = self.find_records(query)
+        if not found:
+            QMessageBox.information(self, "查找结果", f"未找到与“{query}”匹配的记录。")
+            return
+        for record_id, record in found:
+            item = QListWidgetItem(f"第{record_id}位  {record.get('姓名')}  {record.get('联系电话')}  "
+                                   f"{record.get('意向学院')}-{record.get('意向专业')}")
+            item.setData(Qt.UserRole, record_id)
+            self.result_list.addItem(item)
+        self.result_list.setCurrentRow(0)
+
+    def clear_record(self):
+        self.record_id = None
+        self.record = None
+        for line_edit in self.inputs.values():
+            line_edit.clear()
+            line_edit.setEnabled(False)
+        self.save_btn.setEnabled(False)
+
+    def show_record(self, item, previous=None):
+        """把选中的记录填入编辑区"""
+        if item is None:
+            self.clear_record()
+            return
+        record_id = item.data(Qt.UserRole)
+        record = self.main_window.store.get(record_id)
+        if record is None:
+            self.clear_record()
+            return
+        self.record_id, self.record = record_id, record
+        for field, line_edit in self.inputs.items():
+            value = record.get(field)
+            line_edit.setText('' if value is None else str(value))
+            line_edit.setEnabled(True)
+        self.save_btn.setEnabled(True)
+
+    def collect_record(self):
+        """读取并校验编辑区，返回修改后的记录；校验失败时提示并返回None"""
+        values = {field: line_edit.text().strip() for field, line_edit in self.inputs.items()}
+        if not values['姓名']:
+            QMessageBox.warning(self, "验证错误", "请输入姓名！")
+            return None
+        phone = values['联系电话']
+        if not is_phone(phone):
+            QMessageBox.warning(self, "验证错误", "请输入正确的11位手机号！")
+            return None
+        subjects = [s for s in values['选考科目'].replace(',', '、').replace('，', '、').split('、') if s]
+        # 与表单的复选框一致：恰好3门、互不重复
+        if len(subjects) != 3 or len(set(subjects)) != len(subjects) or any(s not in SUBJECTS for s in subjects):
+            QMessageBox.warning(self, "验证错误", f"选考科目需为{'、'.join(SUBJECTS)}中互不重复的3门，以“、”分隔！")
+            return None
+        college, major = values['意向学院'], values['意向专业']
+        major_data = self.main_window.form_page.major_data
+        unchanged = (college, major) == (self.record.get('意向学院'), self.record.get('意向专业'))
+        # 专业目录中已移除的旧专业允许原样保留
+        if not unchanged and major not in major_data.get(college, ()):
+            QMessageBox.warning(self, "验证错误", f"专业目录中没有“{college}-{major}”！")
+            return None
+        try:
+            record = {
+                '姓名': values['姓名'],
+                '所在中学': values['所在中学'],
+                '联系电话': phone,
+                '选考科目': '、'.join(sorted(subjects, key=SUBJECTS.index)),
+                '意向学院': college,
+                '意向专业': major,
+                '最近一次考试分数': float(values['最近一次考试分数']),
+                '总分数': float(values['总分数']),
+                '最近一次年级排名': int(values['最近一次年级排名']),
+                '参加排名人数': int(values['参加排名人数']),
+                '备注': values['备注'],
+            }
+        except ValueError:
+            QMessageBox.warning(self, "验证错误", "分数与排名需填写数字！")
+            return None
+        return record
+
+    def save(self):
+        """只追加这一条记录的修改，res.xlsx 由写入线程在后台重新导出"""
+        if self.record_id is None:
+            return
+        record = self.collect_record()
+        if record is None:
+            return
+        if record == self.record:
+            QMessageBox.information(self, "保存修改", "记录没有变化。")
+            return
+        try:
+            with span('admin_update'):
+                self.main_window.store.update(self.record_id, record)
+            index = self.main_window.record_index
+            index.remove(self.record_id, self.record)
+            index.add(self.record_id, record)
+            self.main_window.writer.request_export()
+        except Exception as e:
+            logger.error(f"修改第{self.record_id}位记录失败: {e}")
+            QMessageBox.critical(self, "保存失败", f"修改记录时出错: {e}")
+            return
+        logger.info(f"已修改第{self.record_id}位记录: {self.record} -> {record}")
+        self.record = record
+        item = self.result_list.currentItem()
+        if item is not None:
+            item.setText(f"第{self.record_id}位  {record['姓名']}  {record['联系电话']}  "
+                         f"{record['意向学院']}-{record['意向专业']}")
+        QMessageBox.information(self, "保存修改", f"第{self.record_id}位意向生的记录已修改。")
+
 
 class WelcomePage(QWidget):
     """欢迎页面"""
@@ -262,6 +538,27 @@ class WelcomePage(QWidget):
         """)
         check_btn.clicked.connect(self.check_export)
         
+        # 记录管理按钮
+        admin_btn = QPushButton("记录管理")
+        admin_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #27ae60;
+                color: white;
+                font-size: 28px;
+                font-weight: bold;
+                padding: 25px 70px;
+                border-radius: 12px;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #2ecc71;
+            }
+            QPushButton:pressed {
+                background-color: #1e8449;
+            }
+        """)
+        admin_btn.clicked.connect(self.open_record_admin)
+        
         # 关闭按钮
         close_btn = QPushButton("关闭")
         close_btn.setStyleSheet("""
@@ -285,6 +582,7 @@ class WelcomePage(QWidget):
         
         button_layout.addWidget(confirm_btn)
         button_layout.addWidget(check_btn)
+        button_layout.addWidget(admin_btn)
         button_layout.addWidget(close_btn)
         
         # 添加到主布局
@@ -298,83 +596,68 @@ class WelcomePage(QWidget):
     def display_logo(self):
         """显示校徽点阵"""
         try:
-            matrix = np.load(logo_path)
             size = self.logosize if hasattr(self, 'logosize') else 256
-            pixmap = QPixmap(size, size)
-            pixmap.fill(QColor(245, 245, 245))
-
-            painter = QPainter(pixmap)
-            red_color = QColor(202, 43, 47)
-
-            scale_x = size / matrix.shape[1]
-            scale_y = size / matrix.shape[0]
-
-            for i in range(matrix.shape[0]):
-                for j in range(matrix.shape[1]):
-                    if matrix[i, j] == 1:
-                        x = int(j * scale_x)
-                        y = int(i * scale_y)
-                        painter.setPen(red_color)
-                        painter.setBrush(red_color)
-                        painter.drawRect(x, y, max(1, int(scale_x)), max(1, int(scale_y)))
-
-            painter.end()
-            self.logo_label.setPixmap(pixmap)
+            with span('render', size=size):
+                self.logo_label.setPixmap(get_logo_pixmap(current_logo_path(), size))
         except Exception as e:
             logger.error(f"加载校徽失败: {e}")
             self.logo_label.setText("校徽加载失败")
             self.logo_label.setStyleSheet("font-size: 20px; color: red;")
     
     def check_export(self):
-        """检查导出的.xlsx文件"""
+        """检查导出数据：完整性、各列缺失、重复手机号及分数排名越界"""
         try:
-            if not os.path.exists('res.xlsx'):
+            # 等待排队中的记录写入存储，res.xlsx 在后台重新生成
+            writer = self.parent_window.writer
+            writer.flush()
+            writer.request_export()
+            if self.parent_window.store.count() == 0:
                 QMessageBox.information(self, "检查结果", "尚未创建导出文件，暂无学生信息。")
                 return
             
-            # 读取Excel文件
-            df = pd.read_excel('res.xlsx')
-            
-            # 检查信息
-            total_students = len(df)
-            incomplete_info = 0
-            
-            # 检查每一行的完整性（备注不计入不完整）
-            for index, row in df.iterrows():
-                row_check = row.drop(labels=['备注']) if '备注' in row.index else row
-                if row_check.isnull().any():
-                    incomplete_info += 1
-            
-            # 弹窗提示
-            msg = f"共有 {total_students} 位学生信息。\n"
-            if incomplete_info > 0:
-                msg += f"其中有 {incomplete_info} 位学生信息不完整。"
-            else:
-                msg += "所有学生信息完整。"
+            # pandas只在检查时才加载，不拖慢启动
+            from report import check_records, format_report
+            # 直接由记录存储构建数据表，无需重新解析res.xlsx
+            df = records_dataframe(self.parent_window.store)
+            msg = format_report(check_records(df))
+            # 顺便把当前的耗时统计写入日志，便于现场排查
+            metrics.dump_summary()
             
             QMessageBox.information(self, "检查结果", msg)
             
         except Exception as e:
             QMessageBox.warning(self, "错误", f"检查导出文件时出错: {e}")
 
+    def open_record_admin(self):
+        """打开记录管理弹窗，查找并修改已登记的记录"""
+        if self.parent_window.record_index is None:
+            QMessageBox.information(self, "记录管理", "正在建立记录索引，请稍后再试。")
+            return
+        # 排队中的记录先写入存储，才能被查找和修改
+        self.parent_window.writer.flush()
+        dialog = RecordAdminDialog(self.parent_window, self)
+        dialog.exec_()
+        dialog.deleteLater()
+
 
 class FormPage(QWidget):
     """表单页面"""
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent_window = parent
-        # 直接使用major_dict
-        self.major_data = major_dict
+        # 只读的专业目录，由catalogue统一加载
+        self.major_data = self.load_major_data()
+        # 专业选择弹窗只构建一次，专业目录变化时才重建
+        self.major_dialog = None
         self.init_ui()
     
     def load_major_data(self):
-        """加载专业数据"""
+        """加载专业目录，读取失败时使用内置目录"""
         try:
-            with open(major_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_catalogue(catalogue_sources(major_path, major_dir))
         except Exception as e:
-            logger.error(f"加载专业数据失败: {e}")
-            return {}
+            logger.error(f"加载专业数据失败，使用内置目录: {e}")
+            return freeze(DEFAULT_CATALOGUE)
     
     def init_ui(self):
         # 设置背景色
@@ -627,9 +910,7 @@ class FormPage(QWidget):
         layout.setSpacing(15)
         
         self.subject_checkboxes = {}
-        subjects = ["物理", "化学", "生物", "政治", "历史", "地理"]
-        
-        for subject in subjects:
+        for subject in SUBJECTS:
             checkbox = QCheckBox(subject)
             checkbox.setStyleSheet("""
                 QCheckBox {
@@ -647,8 +928,50 @@ class FormPage(QWidget):
         widget.setLayout(layout)
         return widget
     
+    def get_major_dialog(self):
+        """取得复用的专业选择弹窗，专业目录已更换时重新构建"""
+        dialog = self.major_dialog
+        if dialog is None or dialog.major_data is not self.major_data:
+            if dialog is not None:
+                dialog.deleteLater()
+            dialog = self.major_dialog = MajorSelectDialog(self.major_data, self)
+        else:
+            dialog.reset()
+        return dialog
+
+    def invalidate_major_dialog(self):
+        """专业目录变化后调用，下次打开时重建弹窗"""
+        # 弹窗正在显示时保留，关闭后再次打开时按目录不一致重建
+        if self.major_dialog is not None and not self.major_dialog.isVisible():
+            self.major_dialog.deleteLater()
+            self.major_dialog = None
+
+    def apply_catalogue(self, major_data, added, removed):
+        """
+        替换专业目录（专业目录文件热加载后由界面线程调用）
+
+        参数:
+        major_data: 新的只读专业目录
+        added, removed: 新增与移除的 (学院, 专业) 列表，只据此增删已有搜索索引的条目，
+                        尚未打开过专业弹窗（没有索引）时不在此构建
+        """
+        update_index(self.major_data, major_data, added, removed)
+        self.major_data = major_data
+        self.invalidate_major_dialog()
+        # 已选专业被移除时清空选择，由学生重新选择
+        if (self.selected_college, self.selected_major) in removed:
+            logger.warning(f"已选专业 {self.selected_college}-{self.selected_major} 已从目录移除")
+            self.selected_college = None
+            self.selected_major = None
+            self.major_btn.setText("选择意向报考专业")
+
     def open_major_dialog(self):
-        dialog = MajorSelectDialog(self.major_data, self)
+        start = time.perf_counter()
+        reused = self.major_dialog is not None
+        dialog = self.get_major_dialog()
+        # 弹窗进入自己的事件循环（已显示）时才算打开完成
+        QTimer.singleShot(0, lambda: metrics.record(
+            'dialog_open', (time.perf_counter() - start) * 1000, reused=reused))
         if dialog.exec_() == QDialog.Accepted:
             college, major = dialog.get_selection()
             if college and major:
@@ -676,113 +999,115 @@ class FormPage(QWidget):
         return selected
     
     def validate_form(self):
-        """验证表单数据"""
+        """验证表单数据，未通过时提示操作员，疑似重复时由操作员决定是否仍然提交"""
+        error, duplicate = self.check_form()
+        if error:
+            QMessageBox.warning(self, "验证错误", error)
+            return False
+        if duplicate:
+            reply = QMessageBox.question(self, "疑似重复", duplicate, QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            return reply == QMessageBox.Yes
+        return True
+
+    # 只统计检查本身的耗时，提示框等待操作员的时间不计入
+    @span('validate')
+    def check_form(self):
+        """
+        检查表单数据
+
+        返回:
+        (错误信息, 疑似重复的提示)，通过检查时错误信息为None，未发现重复时提示为None
+        """
         # 1. 姓名不能为空
         if not self.name_input.text().strip():
-            QMessageBox.warning(self, "验证错误", "请输入姓名！")
-            return False
+            return "请输入姓名！", None
         
         # 2. 联系电话必须是11位数字
         phone = self.phone_input.text().strip()
-        if len(phone) != 11 or not phone.isdigit():
-            QMessageBox.warning(self, "验证错误", "请输入正确的11位手机号！")
-            return False
+        if not is_phone(phone):
+            return "请输入正确的11位手机号！", None
         
         # 3. 选考科目必须六选三
         selected_subjects = self.get_selected_subjects()
         if len(selected_subjects) != 3:
-            QMessageBox.warning(self, "验证错误", "请选择3门选考科目！")
-            return False
+            return "请选择3门选考科目！", None
         
         # 4. 意向报考专业必须选择
         if not self.selected_college or not self.selected_major:
-            QMessageBox.warning(self, "验证错误", "请选择意向报考专业！")
-            return False
+            return "请选择意向报考专业！", None
         
         # 5. 最近一次考试分数不能为空
         if not self.score_input.text().strip():
-            QMessageBox.warning(self, "验证错误", "请输入最近一次考试分数！")
-            return False
+            return "请输入最近一次考试分数！", None
         
         # 6. 总分数不能为空
         if not self.total_score_input.text().strip():
-            QMessageBox.warning(self, "验证错误", "请输入总分数！")
-            return False
+            return "请输入总分数！", None
         
         # 7. 最近一次年级排名不能为空
         if not self.rank_input.text().strip():
-            QMessageBox.warning(self, "验证错误", "请输入最近一次年级排名！")
-            return False
+            return "请输入最近一次年级排名！", None
         
         # 8. 参加排名人数不能为空
         if not self.total_rank_input.text().strip():
-            QMessageBox.warning(self, "验证错误", "请输入参加排名人数！")
-            return False
+            return "请输入参加排名人数！", None
 
         # 备注可为空，无需校验
-        
-        return True
+
+        # 9. 重复提交提示：由操作员决定是否仍然提交
+        return None, self.duplicate_message(self.name_input.text().strip(), phone)
+
+    def duplicate_message(self, name, phone):
+        """按手机号与姓名检查是否已登记过，疑似重复时返回提示，否则返回None"""
+        index = self.parent_window.record_index
+        if index is None:
+            # 启动后索引尚未建立完成（10万条约需1-2秒），此时不做重复检测
+            logger.info("记录索引尚未建立完成，跳过重复检测")
+            return None
+        both, same_phone = index.find_duplicates(phone, name)
+        if both:
+            ids = '、'.join(str(i) for i in both)
+            return f"第{ids}位意向生的姓名和手机号与本次填写的相同，可能是重复提交。\n是否仍然提交？"
+        if same_phone:
+            ids = '、'.join(str(i) for i in same_phone)
+            return f"手机号 {phone} 已被第{ids}位意向生使用。\n是否仍然提交？"
+        return None
     
     def submit_form(self):
         """提交表单"""
         if not self.validate_form():
             return
-        try:
-            # 收集数据
-            student_data = {
-                '姓名': self.name_input.text().strip(),
-                '所在中学': self.school_input.text().strip(),
-                '联系电话': str(self.phone_input.text().strip()),  # 强制为字符串
-                '选考科目': '、'.join(self.get_selected_subjects()),
-                '意向学院': self.selected_college,
-                '意向专业': self.selected_major,
-                '最近一次考试分数': float(self.score_input.text()),
-                '总分数': float(self.total_score_input.text()),
-                '最近一次年级排名': int(self.rank_input.text()),
-                '参加排名人数': int(self.total_rank_input.text()),
-                '备注': self.remark_input.text().strip()
-            }
-            # 导出到Excel
-            self.export_to_excel(student_data)
-            # 清空表单（为下一位学生准备）
-            self.clear_form()
-            # 显示成功页面
-            self.parent_window.show_success_page()
-        except Exception as e:
-            QMessageBox.critical(self, "导出错误", f"导出数据时出错: {e}")
+        # 按钮的clicked信号会传入checked参数，不能直接用装饰器包装槽函数
+        with span('submit'):
+            try:
+                # 收集数据
+                student_data = {
+                    '姓名': self.name_input.text().strip(),
+                    '所在中学': self.school_input.text().strip(),
+                    '联系电话': str(self.phone_input.text().strip()),  # 强制为字符串
+                    '选考科目': '、'.join(self.get_selected_subjects()),
+                    '意向学院': self.selected_college,
+                    '意向专业': self.selected_major,
+                    '最近一次考试分数': float(self.score_input.text()),
+                    '总分数': float(self.total_score_input.text()),
+                    '最近一次年级排名': int(self.rank_input.text()),
+                    '参加排名人数': int(self.total_rank_input.text()),
+                    '备注': self.remark_input.text().strip()
+                }
+                # 保存记录
+                self.save_record(student_data)
+                # 清空表单（为下一位学生准备）
+                self.clear_form()
+                # 显示成功页面
+                self.parent_window.show_success_page()
+            except Exception as e:
+                QMessageBox.critical(self, "导出错误", f"导出数据时出错: {e}")
     
-    def export_to_excel(self, student_data):
-        """导出数据到Excel，手机号强制为文本格式"""
-        import openpyxl
-        from openpyxl.utils.dataframe import dataframe_to_rows
-        from openpyxl.styles import numbers
-        import pandas as pd
-        import os
-        df_new = pd.DataFrame([student_data])
-        if not os.path.exists('res.xlsx'):
-            # 新建文件，手机号列设置为文本格式
-            with pd.ExcelWriter('res.xlsx', engine='openpyxl') as writer:
-                df_new.to_excel(writer, index=True, index_label='序号')
-                ws = writer.book.active
-                for cell in ws[1]:
-                    if cell.value == '联系电话':
-                        col_letter = cell.column_letter
-                        for row in ws.iter_rows(min_row=2, min_col=cell.col_idx, max_col=cell.col_idx):
-                            for c in row:
-                                c.number_format = '@'
-        else:
-            df_existing = pd.read_excel('res.xlsx', index_col=0, dtype={'联系电话':str})
-            df_combined = pd.concat([df_existing, df_new], ignore_index=True)
-            df_combined.index = df_combined.index + 1
-            with pd.ExcelWriter('res.xlsx', engine='openpyxl') as writer:
-                df_combined.to_excel(writer, index=True, index_label='序号')
-                ws = writer.book.active
-                for cell in ws[1]:
-                    if cell.value == '联系电话':
-                        col_letter = cell.column_letter
-                        for row in ws.iter_rows(min_row=2, min_col=cell.col_idx, max_col=cell.col_idx):
-                            for c in row:
-                                c.number_format = '@'
+    def save_record(self, student_data):
+        """保存记录：放入后台写入队列，界面无需等待写入完成"""
+        record_id = self.parent_window.writer.submit(student_data)
+        # 排队中的记录也立即计入索引，连续两次提交同样能发现重复
+        self.parent_window.index_record(record_id, student_data)
     
     def clear_form(self):
         """清空表单"""
@@ -879,64 +1204,104 @@ class SuccessPage(QWidget):
             "愿你心想事成，前程似锦！",
             "愿你以梦为马，不负韶华！"
         ]
-        student_count = self.get_student_count() - 1 if self.get_student_count() != 1 else 1 # 减1因为刚添加完
+        student_count = max(self.get_student_count(), 1)
         self.success_text.setText(f"恭喜你成为第{student_count}位意向生！")
         wish = random.choice(greetings)
         self.wish_text.setText(wish)
 
+    @span('count')
     def get_student_count(self):
-        try:
-            if os.path.exists('res.xlsx'):
-                df = pd.read_excel('res.xlsx', index_col=0)
-                if '序号' in df.index.name or df.index.name == '序号':
-                    if len(df.index) > 0:
-                        max_idx = max(df.index)
-                        return int(max_idx) + 1
-                    else:
-                        return 1
-                else:
-                    return len(df) + 1
-            else:
-                return 1
-        except Exception as e:
-            return 1
+        """已收集人数（含排队中的记录），直接读取存储维护的计数，无需读取res.xlsx"""
+        return self.parent_window.writer.total_count()
 
     def display_logo(self):
         try:
-            matrix = np.load(logo_path)
             size = self.logosize if hasattr(self, 'logosize') else 256
-            pixmap = QPixmap(size, size)
-            pixmap.fill(QColor(245, 245, 245))
-
-            painter = QPainter(pixmap)
-            red_color = QColor(202, 43, 47)
-
-            scale_x = size / matrix.shape[1]
-            scale_y = size / matrix.shape[0]
-
-            for i in range(matrix.shape[0]):
-                for j in range(matrix.shape[1]):
-                    if matrix[i, j] == 1:
-                        x = int(j * scale_x)
-                        y = int(i * scale_y)
-                        painter.setPen(red_color)
-                        painter.setBrush(red_color)
-                        painter.drawRect(x, y, max(1, int(scale_x)), max(1, int(scale_y)))
-
-            painter.end()
-            self.logo_label.setPixmap(pixmap)
+            with span('render', size=size):
+                self.logo_label.setPixmap(get_logo_pixmap(current_logo_path(), size))
         except Exception as e:
             logger.error(f"加载校徽失败: {e}")
             self.logo_label.setText("校徽加载失败")
             self.logo_label.setStyleSheet("font-size: 20px; color: red;")
 
 
+class RecordIndexLoader(QThread):
+    """在后台由记录日志建立重复检测索引，不阻塞窗口显示"""
+    loaded = pyqtSignal(object)
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+
+    def run(self):
+        try:
+            with span('index_load', rows=self.store.count()):
+                index = RecordIndex.from_store(self.store)
+                # 记录管理按序号读取单条记录所需的字节位置索引
+                self.store.prepare_lookup()
+        except Exception as e:
+            logger.error(f"建立记录索引失败，本次运行不做重复检测: {e}")
+            return
+        self.loaded.emit(index)
+
+
 class MainWindow(QMainWindow):
     """主窗口"""
     def __init__(self, logosize=256):
         super().__init__()
         self.logosize = logosize
+        self.open_store()
         self.init_ui()
+        # 进入事件循环（窗口已显示）后再建立索引
+        QTimer.singleShot(0, self.start_index_load)
+
+    def open_store(self):
+        """打开记录存储并启动后台写入线程，首次运行时迁移旧版res.xlsx中的数据"""
+        self.store = JsonlRecordStore(record_path)
+        if self.store.count() == 0 and os.path.exists(export_path):
+            import_workbook(self.store, export_path)
+        # 重复检测索引，窗口显示后在后台由记录日志建立一次，建立完成前为None
+        self.record_index = None
+        self.index_loader = None
+        # 索引建立期间提交的 (序号, 记录)，建立完成后补入
+        self._unindexed = []
+        self.writer = SubmissionWriter(self.store, export_path)
+        self.writer.failed.connect(self.on_write_failed)
+        self.writer.start()
+        # 关闭时等待写入线程结束期间显示的进度提示
+        self.closing_dialog = None
+
+    def start_index_load(self):
+        self.index_loader = RecordIndexLoader(self.store, self)
+        self.index_loader.loaded.connect(self.on_index_loaded)
+        self.index_loader.start()
+
+    def on_index_loaded(self, index):
+        """索引建立完成（界面线程），补入期间提交、但未被读到的记录"""
+        for record_id, record in self._unindexed:
+            if record_id > index.last_id:
+                index.add(record_id, record)
+        self._unindexed = []
+        self.record_index = index
+        logger.info(f"记录索引已建立: {len(index)} 条")
+
+    def index_record(self, record_id, record):
+        """把刚提交的记录加入重复检测索引"""
+        if self.record_index is None:
+            self._unindexed.append((record_id, dict(record)))
+        else:
+            self.record_index.add(record_id, record)
+
+    def on_write_failed(self, message):
+        """后台写入失败时提示操作员，记录会在下一批自动重试"""
+        # 写入线程每段连续失败只通知一次；提示框未关闭时不再叠加新的提示框
+        if getattr(self, '_write_error_shown', False):
+            return
+        self._write_error_shown = True
+        try:
+            QMessageBox.critical(self, "导出错误", message)
+        finally:
+            self._write_error_shown = False
     
     def init_ui(self):
         # 设置窗口标题
@@ -958,6 +1323,10 @@ class MainWindow(QMainWindow):
         self.welcome_page = WelcomePage(self, logosize=self.logosize)
         self.form_page = FormPage(self)
         self.success_page = SuccessPage(self, logosize=self.logosize)
+
+        # 监视专业目录文件，修改后热加载，无需重启
+        self.catalogue_watcher = CatalogueWatcher(major_path, major_dir, self.form_page.major_data, parent=self)
+        self.catalogue_watcher.changed.connect(self.form_page.apply_catalogue)
         
         # 添加到堆叠布局
         self.stacked_layout.addWidget(self.welcome_page)
@@ -980,8 +1349,32 @@ class MainWindow(QMainWindow):
         self.success_page.refresh()
         self.stacked_layout.setCurrentWidget(self.success_page)
 
+    def closeEvent(self, event):
+        """关闭前写完队列中的记录并导出res.xlsx"""
+        if self.writer.isRunning():
+            # 导出可能需要较长时间，不阻塞事件循环：显示进度提示，写入线程结束后再真正关闭
+            if self.closing_dialog is None:
+                self.closing_dialog = QProgressDialog("正在保存记录并导出res.xlsx，请稍候...", None, 0, 0, self)
+                self.closing_dialog.setWindowTitle("正在关闭")
+                self.closing_dialog.setCancelButton(None)
+                self.closing_dialog.setWindowModality(Qt.WindowModal)
+                self.closing_dialog.setMinimumDuration(0)
+                self.closing_dialog.show()
+                self.writer.finished.connect(self.close)
+                self.writer.request_stop()
+            event.ignore()
+            return
+        if self.closing_dialog is not None:
+            self.closing_dialog.close()
+        self.catalogue_watcher.stop()
+        if self.index_loader is not None:
+            self.index_loader.wait()
+        self.store.close()
+        super().closeEvent(event)
+
 
 def main():
+    migrate_logo()
     app = QApplication(sys.argv)
     
     # 设置应用程序图标和样式
@@ -996,8 +1389,19 @@ def main():
     # 创建并显示主窗口
     window = MainWindow()
     window.show()
+
+    if os.environ.get(import_profile.ENV_FLAG):
+        import_profile.uninstall()
+        import_profile.log_report(logger)
+
+    # 上次异常退出时尚未反映到res.xlsx的记录，由日志重放导出
+    if window.store.export_stale(export_path):
+        logger.info(f"{export_path} 落后于记录日志，正在后台重新导出")
+        window.writer.request_export()
     
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    metrics.dump_summary()
+    sys.exit(exit_code)
 
 
 if __name__ == '__main__':
@@ -1013,9 +1417,7 @@ if __name__ == '__main__':
         np.save('logo_matrix.npy', default_matrix)
         logger.info("已创建默认校徽点阵文件。")
 
-    if not os.path.exists('major.json'):
-        logger.error("major.json 文件不存在！")
-        logger.error("请确保专业数据文件存在。")
-        sys.exit(1)
+    if ensure_catalogue(major_path, os.path.join(base_path, "major.json")):
+        logger.warning(f"major.json 文件不存在，已在 {major_path} 生成，可直接编辑该文件调整专业。")
 
     main()
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+程序文件部署
+
+安装包目录中的 deploy_manifest.json 记录每个文件的大小与SHA-256；部署时：
+- 目标文件与清单一致则跳过（已安装清单记录了大小和修改时间，未变化时无需重新计算哈希）
+- 分块复制到 .part 临时文件并回调进度，中途中断后再次部署从已复制的位置继续
+- 复制完成后重新读取目标文件校验哈希，一致后才替换为正式文件
+- 多个文件用线程池并行复制
+
+只依赖标准库，与Tk界面无关，可以在Linux上无界面运行：
+python deploy.py manifest <安装包目录> [文件...]
+python deploy.py install <安装包目录> <安装目录> [--workers N]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+MANIFEST_NAME = "deploy_manifest.json"
+# 安装目录中记录已部署文件的清单
+INSTALLED_NAME = ".installed.json"
+CHUNK_SIZE = 4 * 1024 * 1024
+PART_SUFFIX = ".part"
+
+
+def file_sha256(path, chunk_size=CHUNK_SIZE):
+    """分块计算文件的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_manifest(source_dir, names, workers=None):
+    """
+    计算安装包中各文件的大小与哈希
+
+    返回:
+    manifest: {'version': 1, 'files': {文件名: {'size': 字节数, 'sha256': 哈希}}}
+    """
+    def entry(name):
+        path = os.path.join(source_dir, name)
+        return name, {'size': os.path.getsize(path), 'sha256': file_sha256(path)}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        files = dict(pool.map(entry, names))
+    return {'version': 1, 'files': {name: files[name] for name in names}}
+
+
+def load_manifest(path):
+    """读取清单，文件不存在或损坏时返回None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        return manifest if isinstance(manifest.get('files'), dict) else None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def save_manifest(manifest, path):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def is_deployed(target, expected, installed=None):
+    """
+    目标文件是否已与清单一致
+
+    参数:
+    target: 目标文件路径
+    expected: 清单条目 {'size', 'sha256'}
+    installed: 已安装清单中该文件的条目，大小、修改时间与哈希都吻合时不再读取文件
+    """
+    if not os.path.exists(target) or os.path.getsize(target) != expected['size']:
+        return False
+    if installed and installed.get('sha256') == expected['sha256'] \
+            and installed.get('stat') == _stat_key(target):
+        return True
+    return file_sha256(target) == expected['sha256']
+
+
+def copy_file(source, target, expected, progress=None, chunk_size=CHUNK_SIZE):
+    """
+    分块复制单个文件，支持断点续传，复制后校验
+
+    参数:
+    source, target: 源文件与目标文件路径
+    expected: 清单条目 {'size', 'sha256'}
+    progress: 每写入一块调用 progress(本次新增字节数)
+
+    返回:
+    是否为续传
+    """
+    part = target + PART_SUFFIX
+    size = expected['size']
+    resumed = False
+    for _ in range(2):
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        if offset > size:
+            offset = 0
+        resumed = resumed or offset > 0
+        with open(source, 'rb') as src, open(part, 'r+b' if offset else 'wb') as dst:
+            src.seek(offset)
+            dst.seek(offset)
+            dst.truncate()
+            if offset and progress is not None:
+                progress(offset)
+            for chunk in iter(lambda: src.read(chunk_size), b''):
+                dst.write(chunk)
+                if progress is not None:
+                    progress(len(chunk))
+            dst.flush()
+            os.fsync(dst.fileno())
+        # 重新读取写入的文件校验，续传的前半部分也一并检查
+        if os.path.getsize(part) == size and file_sha256(part, chunk_size) == expected['sha256']:
+            shutil.copystat(source, part)
+            os.replace(part, target)
+            return resumed
+        # 校验失败：丢弃临时文件从头再复制一次
+        written = os.path.getsize(part)
+        os.remove(part)
+        if progress is not None:
+            progress(-written)
+    raise IOError(f"{os.path.basename(target)} 复制后校验失败，请检查安装介质")
+
+
+def deploy(source_dir, target_dir, manifest=None, workers=4, progress=None, callback=None):
+    """
+    按清单把安装包中的文件部署到安装目录
+
+    参数:
+    source_dir: 安装包目录
+    target_dir: 安装目录
+    manifest: 清单，为None时读取安装包中的 deploy_manifest.json
+    workers: 并行复制的线程数
+    progress: 进度回调 progress(已完成字节数, 总字节数)，在工作线程中调用
+    callback: 每完成一个文件调用 callback(result)，在调用线程中调用
+
+    返回:
+    results: 结果字典列表，包含文件名、是否成功、是否跳过、是否续传、字节数、耗时和错误信息
+    """
+    if manifest is None:
+        manifest = load_manifest(os.path.join(source_dir, MANIFEST_NAME))
+        if manifest is None:
+            raise FileNotFoundError(f"{source_dir} 中没有有效的 {MANIFEST_NAME}")
+    os.makedirs(target_dir, exist_ok=True)
+    installed_path = os.path.join(target_dir, INSTALLED_NAME)
+    installed = (load_manifest(installed_path) or {'version': 1, 'files': {}})['files']
+    files = manifest['files']
+    total = sum(entry['size'] for entry in files.values())
+    done = [0]
+    lock = threading.Lock()
+
+    def advance(n):
+        with lock:
+            done[0] += n
+            current = done[0]
+        if progress is not None:
+            progress(current, total)
+
+    def deploy_one(name):
+        start = time.perf_counter()
+        entry = files[name]
+        target = os.path.join(target_dir, name)
+        result = {'file': name, 'ok': False, 'skipped': False, 'resumed': False,
+                  'bytes': entry['size'], 'seconds': 0.0, 'error': None}
+        try:
+            if is_deployed(target, entry, installed.get(name)):
+                result['skipped'] = True
+                advance(entry['size'])
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                result['resumed'] = copy_file(os.path.join(source_dir, name), target, entry, advance)
+            result['ok'] = True
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+        result['seconds'] = time.perf_counter() - start
+        return result
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(deploy_one, name) for name in files]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result['ok']:
+                target = os.path.join(target_dir, result['file'])
+                installed[result['file']] = {'sha256': files[result['file']]['sha256'],
+                                             'stat': _stat_key(target)}
+                save_manifest({'version': 1, 'files': installed}, installed_path)
+            if callback is not None:
+                callback(result)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="程序文件部署")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_manifest = sub.add_parser('manifest', help="为安装包目录生成 deploy_manifest.json")
+    p_manifest.add_argument('source_dir')
+    p_manifest.add_argument('files', nargs='*', help="默认为目录下除清单外的全部文件")
+    p_install = sub.add_parser('install', help="按清单部署到安装目录")
+    p_install.add_argument('source_dir')
+    p_install.add_argument('target_dir')
+    p_install.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    if args.command == 'manifest':
+        names = args.files or sorted(
+            name for name in os.listdir(args.source_dir)
+            if name != MANIFEST_NAME and os.path.isfile(os.path.join(args.source_dir, name)))
+        manifest = build_manifest(args.source_dir, names)
+        save_manifest(manifest, os.path.join(args.source_dir, MANIFEST_NAME))
+        print(f"已生成清单，共 {len(names)} 个文件")
+        return 0
+
+    def report(result):
+        if not result['ok']:
+            print(f"失败: {result['file']}: {result['error']}")
+        elif result['skipped']:
+            print(f"未变化，跳过: {result['file']}")
+        else:
+            resumed = "（续传）" if result['resumed'] else ""
+            print(f"已复制{resumed}: {result['file']} ({result['seconds']:.2f}s)")
+
+    results = deploy(args.source_dir, args.target_dir, workers=args.workers, callback=report)
+    failed = [r for r in results if not r['ok']]
+    skipped = sum(1 for r in results if r['skipped'])
+    print(f"共 {len(results)} 个文件，跳过 {skipped} 个，失败 {len(failed)} 个")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+导入耗时统计
+
+设置环境变量 COLLECT_IMPORT_PROFILE=1 后，collect.py 启动时记录每个模块的导入耗时
+（自身耗时与含子模块的累计耗时），窗口显示后写入日志。只依赖标准库，需在其他导入之前安装。
+"""
+import builtins
+import sys
+import time
+
+ENV_FLAG = 'COLLECT_IMPORT_PROFILE'
+
+_original_import = None
+_stack = []
+_costs = {}
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # 已加载的模块（以及相对导入）直接交给原始实现，几乎没有开销
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    _stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        total = time.perf_counter() - start
+        children = _stack.pop()
+        if _stack:
+            _stack[-1] += total
+        self_time, cumulative = _costs.get(name, (0.0, 0.0))
+        _costs[name] = (self_time + total - children, cumulative + total)
+
+
+def install():
+    """开始统计之后发生的导入"""
+    global _original_import
+    if _original_import is None:
+        _original_import = builtins.__import__
+        builtins.__import__ = _timed_import
+
+
+def uninstall():
+    global _original_import
+    if _original_import is not None:
+        builtins.__import__ = _original_import
+        _original_import = None
+
+
+def report(limit=30):
+    """按累计耗时从高到低返回 (模块, 自身耗时, 累计耗时) 列表，单位秒"""
+    rows = [(name, s, c) for name, (s, c) in _costs.items()]
+    rows.sort(key=lambda r: r[2], reverse=True)
+    return rows[:limit]
+
+
+def log_report(logger, limit=30):
+    """通过logger输出导入耗时明细"""
+    rows = report(limit)
+    total = sum(s for _, (s, _c) in _costs.items())
+    logger.info(f"模块导入共耗时 {total * 1000:.1f} ms，共 {len(_costs)} 个模块")
+    for name, self_time, cumulative in rows:
+        logger.info(f"  导入 {name}: 自身 {self_time * 1000:.1f} ms, 累计 {cumulative * 1000:.1f} ms")
@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 import os
-import shutil
+import queue
 import sys
+import threading
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, ttk
+
+import deploy
 
 import ctypes
 
@@ -30,6 +33,70 @@ def create_shortcut(target, shortcut_path, icon=None, description=None):
 	shortcut.WorkingDirectory = os.path.dirname(target)
 	shortcut.save()
 
+def run_deploy(root, source_dir, target_dir, names):
+	# 在后台线程中按清单部署，主线程显示进度，返回结果列表
+	window = tk.Toplevel(root)
+	window.title("正在安装")
+	window.resizable(False, False)
+	# 复制进行中不允许关闭进度窗口，完成后由poll关闭
+	window.protocol("WM_DELETE_WINDOW", lambda: None)
+	label = tk.Label(window, text="正在校验安装文件...", width=40)
+	label.pack(padx=20, pady=(20, 10))
+	# 计算哈希期间不知道总进度，先显示滚动的进度条
+	bar = ttk.Progressbar(window, length=360, mode="indeterminate", maximum=1000)
+	bar.pack(padx=20, pady=(0, 20))
+	bar.start(20)
+
+	events = queue.Queue()
+	outcome = {}
+
+	def worker():
+		try:
+			manifest = deploy.load_manifest(os.path.join(source_dir, deploy.MANIFEST_NAME))
+			if manifest is None or any(name not in manifest['files'] for name in names):
+				# 安装包未附带清单时现场计算哈希，U盘较慢时可能需要一段时间，放在后台线程中进行
+				manifest = deploy.build_manifest(source_dir, names)
+			events.put(('copying',))
+			outcome['results'] = deploy.deploy(
+				source_dir, target_dir, manifest,
+				progress=lambda done, total: events.put(('progress', done, total)),
+				callback=lambda result: events.put(('file', result)))
+		except Exception as e:
+			outcome['error'] = e
+		events.put(('done',))
+
+	def poll():
+		# Tk控件只能在主线程中更新，进度通过队列传回
+		try:
+			while True:
+				event = events.get_nowait()
+				if event[0] == 'copying':
+					bar.stop()
+					bar.configure(mode="determinate", value=0)
+					label['text'] = "正在复制文件..."
+				elif event[0] == 'progress':
+					bar['value'] = event[1] * 1000 // max(event[2], 1)
+				elif event[0] == 'file':
+					result = event[1]
+					state = "未变化，跳过" if result['skipped'] else "已复制"
+					label['text'] = f"{state}: {result['file']}"
+				else:
+					window.destroy()
+					return
+		except queue.Empty:
+			pass
+		window.after(50, poll)
+
+	threading.Thread(target=worker, daemon=True).start()
+	window.after(50, poll)
+	root.wait_window(window)
+	if 'error' in outcome:
+		raise outcome['error']
+	if 'results' not in outcome:
+		# 进度窗口被意外销毁（如强制关闭），后台线程尚未完成
+		raise RuntimeError("安装被中断，请重新运行安装程序（将从中断处继续）")
+	return outcome['results']
+
 def main():
 	root = tk.Tk()
 	root.withdraw()
@@ -58,11 +125,21 @@ def main():
 		base_path = os.path.dirname(sys.argv[0])
 	for src, dst in files_to_copy:
 		src_path = os.path.join(base_path, src)
-		dst_path = os.path.join(collector_dir, dst)
 		if not os.path.exists(src_path):
 			messagebox.showerror("文件缺失", f"找不到 {src_path}，请确保所有安装文件与安装器在同一目录下！")
 			sys.exit(1)
-		shutil.copy2(src_path, dst_path)
+
+	# 未变化的文件跳过，其余并行分块复制并校验，中断后重新安装可续传
+	try:
+		results = run_deploy(root, base_path, collector_dir, [src for src, _ in files_to_copy])
+	except Exception as e:
+		messagebox.showerror("安装失败", f"安装失败：{e}")
+		sys.exit(1)
+	failed = [r for r in results if not r['ok']]
+	if failed:
+		details = "\n".join(f"{r['file']}: {r['error']}" for r in failed)
+		messagebox.showerror("安装失败", f"以下文件复制失败，请重新运行安装程序（将从中断处继续）：\n{details}")
+		sys.exit(1)
 
 	# 创建桌面快捷方式
 
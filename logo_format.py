@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+校徽点阵的位压缩存储格式（.lgm）
+
+文件头20字节：魔数 b'LGMX'、版本、编码方式、高、宽、数据长度（小端），之后是数据：
+- packbits：np.packbits 按位压缩，每像素1位，比逐字节的 .npy 小8倍
+- rle：游程编码，uint32 游程长度，从0开始交替，适合大块纯色的校徽
+
+读取时只做内存映射，真正用到像素时才解压；旧版 .npy 文件同样可以读取。
+
+另有多分辨率金字塔（.npz）：512/256/128/64 各一层，每个像素为对应方块内红色的
+面积占比（0-255），界面按显示尺寸选取最接近的一层，小尺寸下边缘同样平滑。
+"""
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b'LGMX'
+VERSION = 1
+HEADER = struct.Struct('<4sBBHIII')
+ENCODINGS = {'packbits': 0, 'rle': 1}
+_NPY_MAGIC = b'\x93NUMPY'
+
+# 金字塔层级（边长）
+PYRAMID_LEVELS = (512, 256, 128, 64)
+
+
+def _encode_rle(flat):
+    """游程编码：返回从0开始交替的游程长度"""
+    change = np.flatnonzero(np.diff(flat)) + 1
+    bounds = np.concatenate(([0], change, [flat.size]))
+    runs = np.diff(bounds)
+    if flat.size and flat[0]:
+        runs = np.concatenate(([0], runs))
+    return runs.astype('<u4')
+
+
+def save_logo_matrix(matrix, path, encoding='packbits'):
+    """
+    以位压缩格式保存0-1矩阵
+
+    参数:
+    matrix: 二维0-1矩阵
+    path: 输出路径
+    encoding: 'packbits' 或 'rle'
+    """
+    matrix = np.asarray(matrix)
+    height, width = matrix.shape
+    flat = (matrix.reshape(-1) != 0).astype(np.uint8)
+    if encoding == 'packbits':
+        payload = np.packbits(flat).tobytes()
+    elif encoding == 'rle':
+        payload = _encode_rle(flat).tobytes()
+    else:
+        raise ValueError(f"不支持的编码方式: {encoding}")
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, ENCODINGS[encoding], 0, height, width, len(payload)))
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+class PackedLogoMatrix:
+    """内存映射的位压缩点阵，首次按数组使用时才解压"""
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            magic, version, encoding, _, height, width, length = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} 不是有效的校徽点阵文件")
+        self.path = path
+        self.shape = (height, width)
+        self.encoding = encoding
+        if encoding == ENCODINGS['rle']:
+            self._payload = np.memmap(path, dtype='<u4', mode='r', offset=HEADER.size,
+                                      shape=(length // 4,))
+        else:
+            self._payload = np.memmap(path, dtype=np.uint8, mode='r', offset=HEADER.size,
+                                      shape=(length,))
+        self._matrix = None
+
+    def unpack(self):
+        """解压为uint8的0-1矩阵（结果会缓存）"""
+        if self._matrix is None:
+            height, width = self.shape
+            if self.encoding == ENCODINGS['rle']:
+                values = (np.arange(self._payload.size) % 2).astype(np.uint8)
+                flat = np.repeat(values, self._payload)
+            else:
+                flat = np.unpackbits(self._payload, count=height * width)
+            self._matrix = flat.reshape(self.shape)
+            self._payload = None
+        return self._matrix
+
+    def __array__(self, dtype=None, copy=None):
+        matrix = self.unpack()
+        return matrix if dtype is None else matrix.astype(dtype)
+
+
+def load_logo_matrix(path):
+    """
+    读取校徽点阵，自动识别格式
+
+    返回:
+    位压缩格式返回 PackedLogoMatrix（按需解压），旧版 .npy 返回内存映射数组
+    """
+    with open(path, 'rb') as f:
+        magic = f.read(len(_NPY_MAGIC))
+    if magic.startswith(MAGIC):
+        return PackedLogoMatrix(path)
+    if magic == _NPY_MAGIC:
+        return np.load(path, mmap_mode='r')
+    raise ValueError(f"{path} 不是有效的校徽点阵文件")
+
+
+def migrate_logo_matrix(npy_path, packed_path, encoding='packbits'):
+    """将旧版 .npy 点阵转换为位压缩格式"""
+    save_logo_matrix(np.load(npy_path), packed_path, encoding)
+
+
+def _area_weights(size, n):
+    """
+    把长度为 size 的一维像素按面积分配到 n 个格子的权重矩阵（n x size）
+
+    每个格子覆盖原像素区间 [i*size/n, (i+1)*size/n)，权重为各原像素与该区间的重叠长度，
+    每行之和为1；不能整除时边界像素按比例分到相邻两格。
+    """
+    edges = np.arange(n + 1) * (size / n)
+    pixels = np.arange(size)
+    overlap = (np.minimum(edges[1:, None], pixels[None, :] + 1)
+               - np.maximum(edges[:-1, None], pixels[None, :]))
+    return np.clip(overlap, 0, None) * (n / size)
+
+
+def build_logo_pyramid(matrix, levels=PYRAMID_LEVELS):
+    """
+    由0-1矩阵生成多分辨率金字塔
+
+    每层按面积平均降采样：像素值为对应方块内红色像素的占比（0-255），
+    生成不大于原尺寸的层级，并总是包含原尺寸这一层；不能整除时按面积重采样。
+
+    返回:
+    pyramid: {边长: uint8覆盖率矩阵}
+    """
+    matrix = (np.asarray(matrix) != 0).astype(np.float32)
+    height, width = matrix.shape
+    native = min(height, width)
+    pyramid = {}
+    for n in sorted({n for n in levels if n <= native} | {native}, reverse=True):
+        if height % n == 0 and width % n == 0:
+            coverage = matrix.reshape(n, height // n, n, width // n).mean(axis=(1, 3))
+        else:
+            coverage = _area_weights(height, n) @ matrix @ _area_weights(width, n).T
+        pyramid[n] = np.rint(np.clip(coverage, 0, 1) * 255).astype(np.uint8)
+    return pyramid
+
+
+def save_logo_pyramid(pyramid, path):
+    """将金字塔各层保存到一个压缩的 .npz 文件（0-1图形压缩后只有数KB，与位压缩格式相当）"""
+    if not pyramid:
+        raise ValueError("校徽金字塔没有任何层级，不保存")
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, **{f"L{n}": level for n, level in pyramid.items()})
+    os.replace(tmp_path, path)
+
+
+def load_pyramid_level(path, size):
+    """
+    读取与目标尺寸最接近的一层（距离相同时取较大的一层），只解压这一层
+
+    返回:
+    (层级边长, uint8覆盖率矩阵)
+    """
+    with np.load(path) as npz:
+        levels = [int(name[1:]) for name in npz.files]
+        if not levels:
+            raise ValueError(f"{path} 中没有任何层级")
+        best = min(levels, key=lambda n: (abs(n - size), -n))
+        return best, npz[f"L{best}"]
+
+
+def is_valid_pyramid(path):
+    """金字塔文件存在且至少有一层（只读取zip目录，不解压数据）"""
+    try:
+        with np.load(path) as npz:
+            return any(name.startswith('L') for name in npz.files)
+    except (OSError, ValueError):
+        return False
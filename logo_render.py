@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+校徽点阵渲染
+
+用NumPy把0-1矩阵一次性生成RGBA图像，再通过QImage直接交给Qt，
+替代逐像素调用QPainter.drawRect的绘制方式。
+"""
+import numpy as np
+from PyQt5.QtGui import QImage, QPixmap
+
+# 校徽红色与页面背景色
+RED = (202, 43, 47)
+BACKGROUND = (245, 245, 245)
+
+
+def resample_matrix(matrix, size):
+    """最近邻缩放矩阵到 size×size，与原先逐格绘制的效果一致"""
+    h, w = matrix.shape
+    rows = np.arange(size) * h // size
+    cols = np.arange(size) * w // size
+    return matrix[rows[:, None], cols]
+
+
+def render_labels_rgba(labels, size, colors):
+    """
+    将调色板标签矩阵渲染为 size×size×4 的RGBA数组
+
+    参数:
+    labels: 标签矩阵，值为 colors 的下标
+    size: 输出边长（像素）
+    colors: 各标签对应的RGB颜色
+    """
+    lut = np.array([(*c, 255) for c in colors], dtype=np.uint8)
+    return lut[resample_matrix(np.asarray(labels), size)]
+
+
+def render_logo_rgba(matrix, size, color=RED, background=BACKGROUND):
+    """
+    将0-1矩阵渲染为 size×size×4 的RGBA数组
+
+    参数:
+    matrix: 校徽点阵，1为红色
+    size: 输出边长（像素）
+    color: 前景色RGB
+    background: 背景色RGB
+    """
+    mask = np.asarray(matrix) != 0
+    return render_labels_rgba(mask.view(np.uint8), size, [background, color])
+
+
+def render_coverage_rgba(coverage, size, color=RED, background=BACKGROUND):
+    """
+    将覆盖率矩阵（0-255，金字塔的一层）按比例混合前景色与背景色，得到抗锯齿的RGBA数组
+    """
+    alpha = resample_matrix(np.asarray(coverage), size).astype(np.uint16)[..., None]
+    fg = np.array(color, dtype=np.uint16)
+    bg = np.array(background, dtype=np.uint16)
+    rgba = np.empty((size, size, 4), dtype=np.uint8)
+    rgba[..., :3] = (bg * (255 - alpha) + fg * alpha + 127) // 255
+    rgba[..., 3] = 255
+    return rgba
+
+
+def rgba_to_pixmap(rgba):
+    """RGBA数组转QPixmap，QImage直接引用数组内存，不做中间拷贝"""
+    height, width = rgba.shape[:2]
+    rgba = np.ascontiguousarray(rgba)
+    image = QImage(rgba.data, width, height, width * 4, QImage.Format_RGBA8888)
+    # fromImage在rgba仍存活时完成转换，之后QImage不再引用数组内存
+    return QPixmap.fromImage(image)
+
+
+def render_logo_pixmap(matrix, size, color=RED, background=BACKGROUND):
+    """将0-1矩阵渲染为QPixmap"""
+    return rgba_to_pixmap(render_logo_rgba(matrix, size, color, background))
+
+
+def render_coverage_pixmap(coverage, size, color=RED, background=BACKGROUND):
+    """将金字塔的一层渲染为QPixmap"""
+    return rgba_to_pixmap(render_coverage_rgba(coverage, size, color, background))
+
+
+def render_labels_pixmap(labels, size, colors):
+    """将多色标签矩阵渲染为QPixmap"""
+    return rgba_to_pixmap(render_labels_rgba(labels, size, colors))
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+专业搜索索引
+
+对"学院-专业"建立一元/二元字符索引，除中文外还索引拼音全拼和拼音首字母
+（如 "jsj" 可以找到 计算机科学与技术），查询只检查候选条目并按匹配位置排序。
+索引每个进程只构建一次，支持按条目增删，专业目录变化时无需整体重建。
+拼音依赖可选的 pypinyin，未安装时只支持中文搜索；pypinyin 导入较慢（约0.3秒），
+在第一次构建索引时才导入，不拖慢程序启动。
+"""
+# pypinyin 的 (lazy_pinyin, Style)，尚未导入时为None，未安装时为False
+_pinyin = None
+
+
+def _load_pinyin():
+    global _pinyin
+    if _pinyin is None:
+        try:
+            from pypinyin import Style, lazy_pinyin
+            _pinyin = (lazy_pinyin, Style)
+        except ImportError:
+            _pinyin = False
+    return _pinyin
+
+
+def pinyin_keys(text):
+    """返回 (全拼, 首字母)，未安装pypinyin时返回空列表"""
+    pinyin = _load_pinyin()
+    if not pinyin:
+        return []
+    lazy_pinyin, Style = pinyin
+    syllables = [s.lower() for s in lazy_pinyin(text, style=Style.NORMAL)]
+    initials = [s[0] for s in syllables if s]
+    return [''.join(syllables), ''.join(initials)]
+
+
+def _grams(text):
+    """一元与二元字符片段"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def _query_grams(query):
+    if len(query) == 1:
+        return {query}
+    return {query[i:i + 2] for i in range(len(query) - 1)}
+
+
+class MajorSearchIndex:
+    """"学院-专业"搜索索引"""
+    def __init__(self, major_data=None):
+        self._entries = {}      # (学院, 专业) -> (顺序号, 专业相关键, 学院相关键)
+        self._postings = {}     # 字符片段 -> {(学院, 专业)}
+        self._order = 0
+        if major_data:
+            for college, majors in major_data.items():
+                for major in majors:
+                    self.add(college, major)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, pair):
+        return pair in self._entries
+
+    def add(self, college, major):
+        """加入一个条目"""
+        key = (college, major)
+        if key in self._entries:
+            return
+        major_keys = [major.lower()] + pinyin_keys(major)
+        college_keys = [college.lower()] + pinyin_keys(college) + [f"{college}-{major}".lower()]
+        self._entries[key] = (self._order, major_keys, college_keys)
+        self._order += 1
+        for text in major_keys + college_keys:
+            for gram in _grams(text):
+                self._postings.setdefault(gram, set()).add(key)
+
+    def remove(self, college, major):
+        """移除一个条目，只清理该条目涉及的字符片段"""
+        key = (college, major)
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for text in entry[1] + entry[2]:
+            for gram in _grams(text):
+                postings = self._postings.get(gram)
+                if postings is not None:
+                    postings.discard(key)
+                    if not postings:
+                        del self._postings[gram]
+
+    def _rank(self, key, query):
+        """排名：专业名前缀 < 学院名前缀 < 专业名包含 < 学院名包含，其后按位置、长度"""
+        order, major_keys, college_keys = self._entries[key]
+        best = None
+        for group, keys in ((0, major_keys), (1, college_keys)):
+            for text in keys:
+                pos = text.find(query)
+                if pos < 0:
+                    continue
+                rank = (0 if pos == 0 else 2) + group, pos
+                if best is None or rank < best:
+                    best = rank
+        if best is None:
+            return None
+        return best + (len(key[1]), order)
+
+    def search(self, query, limit=50):
+        """返回按相关度排序的"学院-专业"列表"""
+        query = query.strip().lower()
+        if not query:
+            return [f"{c}-{m}" for c, m in sorted(self._entries, key=lambda k: self._entries[k][0])][:limit]
+        candidates = None
+        for gram in _query_grams(query):
+            postings = self._postings.get(gram)
+            if not postings:
+                return []
+            candidates = set(postings) if candidates is None else candidates & postings
+            if not candidates:
+                return []
+        ranked = []
+        for key in candidates:
+            rank = self._rank(key, query)
+            if rank is not None:
+                ranked.append((rank, key))
+        ranked.sort()
+        return [f"{c}-{m}" for _, (c, m) in ranked[:limit]]
+
+
+_indexes = {}
+
+
+def _catalogue_key(major_data):
+    return tuple((college, tuple(majors)) for college, majors in major_data.items())
+
+
+def get_index(major_data):
+    """按专业目录内容缓存索引，同一目录在进程内只构建一次"""
+    key = _catalogue_key(major_data)
+    index = _indexes.get(key)
+    if index is None:
+        index = _indexes[key] = MajorSearchIndex(major_data)
+    return index
+
+
+def update_index(old_data, new_data, added, removed):
+    """
+    专业目录变化后更新已有索引，只增删变化的条目
+
+    参数:
+    old_data, new_data: 变化前后的专业目录
+    added, removed: 新增与移除的 (学院, 专业) 列表
+
+    返回:
+    与 new_data 对应的索引；尚未建立过索引时返回None，
+    留到第一次打开专业弹窗时再由 get_index 构建，不在热加载回调中整体构建
+    """
+    index = _indexes.pop(_catalogue_key(old_data), None)
+    if index is None:
+        return _indexes.get(_catalogue_key(new_data))
+    for college, major in removed:
+        index.remove(college, major)
+    for college, major in added:
+        index.add(college, major)
+    _indexes[_catalogue_key(new_data)] = index
+    return index
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+耗时统计
+
+span 既可作上下文管理器也可作装饰器，记录一段操作的耗时：
+- 每次结束时向单独的日志文件（log/metrics_*.jsonl）写一行JSON，包含时间、名称、耗时与附加字段
+- 同时累加到按名称区分的直方图，退出时或按需（dump_summary）把各项的次数、平均值、分位数写入同一文件
+
+JSON记录通过 loguru 的 bind(metric=...) 标记，只进入 configure 添加的专用输出，
+主日志用 exclude_metrics 过滤掉这些记录。未调用 configure 时只累加直方图。
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import ContextDecorator
+from datetime import datetime
+
+from loguru import logger
+
+# 直方图各桶的上限（毫秒），最后一个桶收纳更慢的记录
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_lock = threading.Lock()
+_histograms = {}
+_sink_id = None
+
+
+class Histogram:
+    """固定分桶的耗时直方图"""
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.errors = 0
+
+    def add(self, ms, ok=True):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if not ok:
+            self.errors += 1
+
+    def quantile(self, q):
+        """分位数的估计值：所在桶的上限，不超过实际最大值"""
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= target:
+                return min(BUCKETS_MS[i], round(self.max_ms, 3)) if i < len(BUCKETS_MS) else round(self.max_ms, 3)
+        return round(self.max_ms, 3)
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.quantile(0.50),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'max_ms': round(self.max_ms, 3),
+        }
+
+
+def exclude_metrics(record):
+    """主日志的过滤器：不写入耗时记录"""
+    return 'metric' not in record['extra']
+
+
+def configure(log_dir):
+    """添加耗时记录的专用日志文件，返回其路径"""
+    global _sink_id
+    path = os.path.join(log_dir, f"metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+    if _sink_id is None:
+        _sink_id = logger.add(path, format="{message}", encoding="utf-8",
+                              filter=lambda record: 'metric' in record['extra'],
+                              rotation="10 MB", retention="10 days", enqueue=True)
+    return path
+
+
+def _emit(payload):
+    if _sink_id is not None:
+        logger.bind(metric=payload['span']).info(json.dumps(payload, ensure_ascii=False))
+
+
+def record(name, ms, ok=True, **fields):
+    """记录一次耗时（毫秒）"""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(ms, ok)
+    _emit({'ts': datetime.now().isoformat(timespec='milliseconds'), 'span': name,
+           'ms': round(ms, 3), 'ok': ok, **fields})
+
+
+class span(ContextDecorator):
+    """
+    记录一段操作的耗时
+
+    用法:
+    with span('export', rows=n): ...
+    @span('validate')
+    def check_form(self): ...
+    """
+    def __init__(self, name, **fields):
+        self.name = name
+        self.fields = fields
+        self._start = None
+
+    def _recreate_cm(self):
+        # 作为装饰器时每次调用使用新的实例，可重入、可跨线程
+        return span(self.name, **self.fields)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self._start) * 1000
+        record(self.name, ms, ok=exc_type is None, **self.fields)
+        return False
+
+
+def summary():
+    """各项耗时的统计 {名称: {count, errors, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}"""
+    with _lock:
+        return {name: h.summary() for name, h in sorted(_histograms.items())}
+
+
+def dump_summary():
+    """把当前统计写入耗时日志，返回统计结果"""
+    result = summary()
+    if _sink_id is not None:
+        payload = {'ts': datetime.now().isoformat(timespec='milliseconds'), 'span': 'summary',
+                   'histograms': result}
+        logger.bind(metric='summary').info(json.dumps(payload, ensure_ascii=False))
+    return result
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+进程级校徽图像缓存
+
+点阵文件按 (路径, 修改时间, 文件大小) 识别，只解码一次；渲染结果再按
+(文件, 像素尺寸, 颜色) 缓存，各页面及之后的缩放都复用同一份QPixmap。
+金字塔文件（.npz）按显示尺寸只读取最接近的一层。
+"""
+import os
+from collections import OrderedDict
+
+from logo_format import load_logo_matrix, load_pyramid_level
+from logo_render import BACKGROUND, RED, render_coverage_pixmap, render_logo_pixmap
+
+
+class LRUCache:
+    """简单的最近最少使用缓存"""
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_matrices = LRUCache(maxsize=4)
+_pixmaps = LRUCache(maxsize=16)
+
+
+def file_identity(path):
+    """文件标识：内容变化后修改时间或大小随之变化，缓存自动失效"""
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_mtime_ns, st.st_size
+
+
+def load_matrix(path):
+    """读取点阵文件（位压缩格式按需解压），同一文件只解码一次"""
+    key = file_identity(path)
+    matrix = _matrices.get(key)
+    if matrix is None:
+        matrix = load_logo_matrix(path)
+        _matrices.put(key, matrix)
+    return matrix
+
+
+def load_level(path, size):
+    """读取金字塔中与目标尺寸最接近的一层，同一层只解码一次"""
+    key = (file_identity(path), size)
+    level = _matrices.get(key)
+    if level is None:
+        level = load_pyramid_level(path, size)[1]
+        _matrices.put(key, level)
+    return level
+
+
+def get_logo_pixmap(path, size, color=RED, background=BACKGROUND):
+    """获取渲染好的校徽QPixmap，命中缓存时不再解码和渲染"""
+    key = (file_identity(path), size, tuple(color), tuple(background))
+    pixmap = _pixmaps.get(key)
+    if pixmap is None:
+        if path.endswith('.npz'):
+            pixmap = render_coverage_pixmap(load_level(path, size), size, color, background)
+        else:
+            pixmap = render_logo_pixmap(load_matrix(path), size, color, background)
+        _pixmaps.put(key, pixmap)
+    return pixmap
+
+
+def clear():
+    """清空全部缓存"""
+    _matrices.clear()
+    _pixmaps.clear()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+记录索引
+
+按规范化后的联系电话和姓名建立哈希索引，用于提交前的重复检测和按姓名/手机号查找记录。
+启动时由记录存储逐条读取一次建立，之后每次提交、修改时增量更新，无需重新读取res.xlsx。
+索引只保存整数：手机号转为整数，姓名取CRC32，值为序号（多条时为序号列表），
+10万条记录约占十几MB，不随姓名、手机号的长度增长。
+"""
+import re
+import zlib
+
+# 只接受ASCII数字：str.isdigit() 对 '²'、'①' 等也返回True，随后 int() 会失败
+_PHONE = re.compile(r'[0-9]{11}')
+
+
+def is_ascii_digits(text):
+    return text.isascii() and text.isdigit()
+
+
+def is_phone(text):
+    """是否为11位（ASCII）数字"""
+    return _PHONE.fullmatch(text) is not None
+
+
+def normalize_phone(phone):
+    """只保留数字，去掉 +86/86 国家码"""
+    digits = ''.join(ch for ch in str(phone or '') if '0' <= ch <= '9')
+    if len(digits) == 13 and digits.startswith('86'):
+        digits = digits[2:]
+    return digits
+
+
+def normalize_name(name):
+    """去掉所有空白"""
+    return ''.join(str(name or '').split())
+
+
+def phone_key(phone):
+    """手机号的整数键，前面补1以保留开头的0；无数字时返回None"""
+    # 绝大多数记录已是11位数字，跳过逐字符规范化
+    if isinstance(phone, str) and is_phone(phone):
+        return int('1' + phone)
+    digits = normalize_phone(phone)
+    return int('1' + digits) if digits else None
+
+
+def name_key(name):
+    name = normalize_name(name)
+    return zlib.crc32(name.encode('utf-8')) if name else None
+
+
+def _add(table, key, record_id):
+    ids = table.get(key)
+    if ids is None:
+        table[key] = record_id
+    elif isinstance(ids, list):
+        if record_id not in ids:
+            ids.append(record_id)
+    elif ids != record_id:
+        table[key] = [ids, record_id]
+
+
+def _remove(table, key, record_id):
+    ids = table.get(key)
+    if ids == record_id:
+        del table[key]
+    elif isinstance(ids, list) and record_id in ids:
+        ids.remove(record_id)
+        if len(ids) == 1:
+            table[key] = ids[0]
+
+
+def _ids(table, key):
+    ids = table.get(key)
+    if ids is None:
+        return []
+    return list(ids) if isinstance(ids, list) else [ids]
+
+
+class RecordIndex:
+    """联系电话/姓名 -> 序号 的哈希索引"""
+    def __init__(self):
+        self._by_phone = {}
+        self._by_name = {}
+        self._count = 0
+        # 已加入的最大序号
+        self.last_id = 0
+
+    @classmethod
+    def from_store(cls, store):
+        """由记录存储逐条建立索引（不缓存记录内容）"""
+        index = cls()
+        for record_id, record in store.iter_records():
+            index.add(record_id, record)
+        return index
+
+    def __len__(self):
+        return self._count
+
+    def add(self, record_id, record):
+        """加入一条记录"""
+        phone, name = phone_key(record.get('联系电话')), name_key(record.get('姓名'))
+        if phone is not None:
+            _add(self._by_phone, phone, record_id)
+        if name is not None:
+            _add(self._by_name, name, record_id)
+        self._count += 1
+        self.last_id = max(self.last_id, record_id)
+
+    def remove(self, record_id, record):
+        """移除一条记录（record 为加入时的内容）"""
+        phone, name = phone_key(record.get('联系电话')), name_key(record.get('姓名'))
+        if phone is not None:
+            _remove(self._by_phone, phone, record_id)
+        if name is not None:
+            _remove(self._by_name, name, record_id)
+        self._count -= 1
+
+    def find_duplicates(self, phone, name):
+        """
+        查找可能重复的记录
+
+        返回:
+        (手机号与姓名都相同的序号列表, 仅手机号相同的序号列表)
+        """
+        same_phone = _ids(self._by_phone, phone_key(phone))
+        if not same_phone:
+            return [], []
+        same_name = set(_ids(self._by_name, name_key(name)))
+        both = [i for i in same_phone if i in same_name]
+        return both, [i for i in same_phone if i not in same_name]
+
+    def lookup(self, query):
+        """按手机号或姓名精确查找，返回按序号排序的候选序号（姓名CRC可能碰撞，需由调用方核对）"""
+        ids = set(_ids(self._by_name, name_key(query)))
+        if any('0' <= ch <= '9' for ch in str(query)):
+            ids.update(_ids(self._by_phone, phone_key(query)))
+        return sorted(ids)
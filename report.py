@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+导出数据完整性检查
+
+全部按列向量化计算，不逐行遍历，数万条记录也能即时完成。
+"""
+import pandas as pd
+
+# 可以为空的列
+OPTIONAL_FIELDS = ['备注']
+
+
+def _blank(column):
+    """空值或空白字符串"""
+    missing = column.isna()
+    if not pd.api.types.is_numeric_dtype(column):
+        missing |= column.astype(str).str.strip().eq('')
+    return missing
+
+
+def check_records(df):
+    """
+    检查学生记录
+
+    参数:
+    df: 学生记录表（每行一位学生）
+
+    返回:
+    report: 包含总人数、不完整人数、各列缺失数、重复手机号及分数/排名越界情况的字典
+    """
+    required = [c for c in df.columns if c not in OPTIONAL_FIELDS]
+    missing = pd.DataFrame({c: _blank(df[c]) for c in required}, index=df.index)
+    missing_by_field = missing.sum()
+
+    report = {
+        'total': len(df),
+        'incomplete': int(missing.any(axis=1).sum()),
+        'missing_by_field': {c: int(n) for c, n in missing_by_field.items() if n > 0},
+        'duplicate_phones': {},
+        'invalid_phones': 0,
+        'bad_scores': 0,
+        'bad_ranks': 0,
+    }
+
+    if '联系电话' in df.columns:
+        phone = df['联系电话'].astype(str).str.strip()
+        valid = phone.str.fullmatch(r'\d{11}')
+        report['invalid_phones'] = int((~valid & ~missing['联系电话']).sum())
+        dup = phone[valid & phone.duplicated(keep=False)]
+        report['duplicate_phones'] = {p: int(n) for p, n in dup.value_counts().items()}
+
+    if {'最近一次考试分数', '总分数'} <= set(df.columns):
+        score = pd.to_numeric(df['最近一次考试分数'], errors='coerce')
+        total = pd.to_numeric(df['总分数'], errors='coerce')
+        bad = (score < 0) | (total <= 0) | (score > total)
+        report['bad_scores'] = int(bad.sum())
+
+    if {'最近一次年级排名', '参加排名人数'} <= set(df.columns):
+        rank = pd.to_numeric(df['最近一次年级排名'], errors='coerce')
+        total_rank = pd.to_numeric(df['参加排名人数'], errors='coerce')
+        bad = (rank < 1) | (total_rank < 1) | (rank > total_rank)
+        report['bad_ranks'] = int(bad.sum())
+
+    return report
+
+
+def format_report(report, max_items=5):
+    """将检查结果整理为弹窗文本"""
+    msg = f"共有 {report['total']} 位学生信息。\n"
+    if report['incomplete'] > 0:
+        msg += f"其中有 {report['incomplete']} 位学生信息不完整。\n"
+        for field, n in report['missing_by_field'].items():
+            msg += f"  - {field}缺失：{n} 条\n"
+    else:
+        msg += "所有学生信息完整。\n"
+
+    dup = report['duplicate_phones']
+    if dup:
+        msg += f"重复的联系电话：{len(dup)} 个（涉及 {sum(dup.values())} 条记录）\n"
+        for phone, n in list(dup.items())[:max_items]:
+            msg += f"  - {phone}：{n} 条\n"
+        if len(dup) > max_items:
+            msg += "  - ……\n"
+    if report['invalid_phones']:
+        msg += f"联系电话格式不正确：{report['invalid_phones']} 条\n"
+    if report['bad_scores']:
+        msg += f"考试分数超出范围：{report['bad_scores']} 条\n"
+    if report['bad_ranks']:
+        msg += f"年级排名超出范围：{report['bad_ranks']} 条\n"
+    return msg.rstrip('\n')
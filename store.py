@@ -0,0 +1,499 @@
+# -*- coding: utf-8 -*-
+"""
+学生记录存储
+
+主存储为追加写入的 JSON Lines 日志（res.jsonl），每次提交只追加一行并落盘，
+与已收集的人数无关；res.xlsx 只是由日志派生的导出文件，按需重新生成，
+写入临时文件后再原子替换，导出中途断电也不会损坏已有文件。
+"""
+import json
+import os
+import re
+import threading
+
+from loguru import logger
+
+# 导出表格的列顺序
+FIELDS = [
+    '姓名', '所在中学', '联系电话', '选考科目', '意向学院', '意向专业',
+    '最近一次考试分数', '总分数', '最近一次年级排名', '参加排名人数', '备注'
+]
+
+# 选考科目（六选三）
+SUBJECTS = ["物理", "化学", "生物", "政治", "历史", "地理"]
+
+# 日志行开头的操作与序号；本程序写出的行都能直接匹配，其他写法的行退回完整解析
+_ENTRY_HEAD = re.compile(rb'\{\s*"op"\s*:\s*"(\w+)"\s*,\s*"id"\s*:\s*(\d+)\s*,')
+
+
+def _valid_entry(entry):
+    """日志行能解析但缺少操作、序号或记录内容时视为损坏"""
+    return (isinstance(entry, dict) and entry.get('op') in ('add', 'update')
+            and isinstance(entry.get('id'), int) and not isinstance(entry['id'], bool)
+            and isinstance(entry.get('data'), dict))
+
+
+def _entry_head(line):
+    """取出一行日志的 (操作, 序号)，无需解析整行；无法解析时返回None"""
+    match = _ENTRY_HEAD.match(line)
+    if match:
+        return match.group(1).decode('ascii'), int(match.group(2))
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    return (entry['op'], entry['id']) if _valid_entry(entry) else None
+
+
+class RecordStore:
+    """记录存储接口，新的存储格式继承此类并实现对应方法即可"""
+
+    def append(self, record):
+        """追加一条记录，返回其序号"""
+        return self.append_many([record])[0]
+
+    def append_many(self, records):
+        """批量追加记录，返回序号列表"""
+        raise NotImplementedError
+
+    def records(self):
+        """按序号顺序返回 (序号, 记录) 列表"""
+        raise NotImplementedError
+
+    def iter_records(self):
+        """按序号顺序逐条返回 (序号, 记录)，供流式导出使用"""
+        return iter(self.records())
+
+    def get(self, record_id):
+        """返回指定序号的记录，不存在时返回None"""
+        return dict(self.records()).get(record_id)
+
+    def prepare_lookup(self):
+        """预先建立按序号读取记录所需的索引，可在后台线程中调用"""
+        pass
+
+    def update(self, record_id, record):
+        """修改一条已有记录（整条替换）"""
+        raise NotImplementedError
+
+    def count(self):
+        """已收集的记录数"""
+        raise NotImplementedError
+
+    def last_id(self):
+        """最大序号，新记录的序号从其后依次递增（跳过损坏行时可能大于记录数）"""
+        raise NotImplementedError
+
+    def stats(self):
+        """各意向学院的人数"""
+        raise NotImplementedError
+
+    def version(self):
+        """存储版本，每次写入后增大，用于判断导出文件是否过期"""
+        raise NotImplementedError
+
+    def mark_exported(self, version):
+        """记录已导出到res.xlsx的存储版本"""
+        raise NotImplementedError
+
+    def export_stale(self, path):
+        """导出文件是否缺失或落后于存储"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonlRecordStore(RecordStore):
+    """
+    JSON Lines 追加日志
+
+    每行一个操作：{"op": "add", "id": 序号, "data": {...}}，
+    修改记录时追加 {"op": "update", "id": 序号, "data": {...}}，以最后一次为准。
+    旁路文件 res.meta.json 记录人数、最大序号和各学院人数，每次追加后原子更新，
+    打开存储和查询人数都无需扫描日志；日志内容只在导出时逐行读取，不常驻内存。
+    按序号读取、修改记录通过 序号 -> 最新一行的字节位置 的索引只读一行。
+    """
+    def __init__(self, path):
+        self.path = path
+        self.meta_path = os.path.splitext(path)[0] + '.meta.json'
+        self._lock = threading.Lock()
+        # 序号 -> 该记录最新一行（新增或修改）在日志中的字节位置，首次按序号读取时建立
+        self._offsets = None
+        self.meta = None
+        self._repair_tail()
+        self._load_meta()
+        # 不经缓冲直接写入文件，写入失败时截断即可完全撤销
+        self._file = open(self.path, 'ab', buffering=0)
+
+    def _journal_size(self):
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def _iter_lines(self, limit=None, start=0):
+        """
+        逐行返回 (行号, 字节位置, 原始行)
+
+        参数:
+        limit: 读取的字节数上限，避免读到正在追加的半行
+        start: 开始读取的字节位置（须为行首），行号从此处重新计数
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            offset = start
+            for lineno, line in enumerate(f, 1):
+                start, offset = offset, offset + len(line)
+                if limit is not None and offset > limit:
+                    break
+                if line.strip():
+                    yield lineno, start, line
+
+    def _read_journal(self, limit=None):
+        """逐行解析日志，返回 (字节位置, 操作)"""
+        for lineno, offset, line in self._iter_lines(limit):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # 写入中途断电只会损坏最后一行，跳过即可
+                logger.warning(f"{self.path} 第{lineno}行无法解析，已跳过")
+                continue
+            if not _valid_entry(entry):
+                # 能解析但缺少操作、序号或记录内容，同样跳过，不影响其余记录
+                logger.warning(f"{self.path} 第{lineno}行缺少操作、序号或记录内容，已跳过")
+                continue
+            yield offset, entry
+
+    def _repair_tail(self):
+        """断电可能留下写了一半的最后一行，截掉它以免与下一次追加的内容粘连"""
+        size = self._journal_size()
+        if size == 0:
+            return
+        with open(self.path, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b'\n':
+                return
+            # 向前查找最后一个换行符
+            pos, data, cut = size, b'', 0
+            while pos > 0:
+                step = min(4096, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+                idx = data.rfind(b'\n')
+                if idx != -1:
+                    cut = pos + idx + 1
+                    break
+            f.seek(cut)
+            tail = f.read().decode('utf-8', 'replace')
+            f.truncate(cut)
+        logger.warning(f"{self.path} 末尾有未写完的记录，已截断: {tail}")
+
+    def _load_meta(self):
+        """读取旁路统计，缺失、损坏或与日志大小不一致时由日志重建"""
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('journal_size') == self._journal_size():
+                self.meta = meta
+                return
+            logger.warning(f"{self.meta_path} 与记录日志不一致，重新统计")
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            logger.warning(f"{self.meta_path} 已损坏，重新统计")
+        self._rebuild_meta()
+
+    def _rebuild_meta(self):
+        self.meta = {'count': 0, 'last_id': 0, 'colleges': {}, 'updates': 0}
+        # 重新统计时顺便建立字节位置索引；修改操作需要知道记录原来的学院
+        self._offsets = {}
+        colleges = {}
+        for offset, entry in self._read_journal():
+            record_id, op = int(entry['id']), entry.get('op')
+            if op == 'update':
+                if record_id not in colleges:
+                    continue
+                self._apply_meta(entry, colleges[record_id])
+            elif op == 'add':
+                self._apply_meta(entry)
+            else:
+                continue
+            self._apply_offset(entry, offset)
+            colleges[record_id] = entry['data'].get('意向学院') or ''
+        self.meta['journal_size'] = self._journal_size()
+        self._write_meta()
+
+    def _write_meta(self):
+        """先写临时文件再替换，保证旁路文件始终完整"""
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+
+    def _apply_offset(self, entry, offset):
+        if self._offsets is None:
+            return
+        record_id = int(entry['id'])
+        if entry.get('op') == 'add' or (entry.get('op') == 'update' and record_id in self._offsets):
+            self._offsets[record_id] = offset
+
+    def _apply_meta(self, entry, previous_college=None):
+        """previous_college 为修改前记录的学院，修改操作据此调整各学院人数"""
+        meta = self.meta
+        colleges = meta['colleges']
+        if entry.get('op') == 'add':
+            meta['count'] += 1
+            meta['last_id'] = max(meta['last_id'], int(entry['id']))
+            college = entry['data'].get('意向学院') or ''
+            colleges[college] = colleges.get(college, 0) + 1
+        elif entry.get('op') == 'update':
+            meta['updates'] = meta.get('updates', 0) + 1
+            old = previous_college or ''
+            new = entry['data'].get('意向学院') or ''
+            if old != new:
+                colleges[old] = colleges.get(old, 0) - 1
+                if colleges[old] <= 0:
+                    del colleges[old]
+                colleges[new] = colleges.get(new, 0) + 1
+
+    def _scan_offsets(self, offsets, start, limit):
+        """把 [start, limit) 范围内各行的字节位置并入 offsets，只取每行开头的操作和序号，不解析记录内容"""
+        for lineno, offset, line in self._iter_lines(limit, start):
+            head = _entry_head(line)
+            if head is None:
+                continue
+            op, record_id = head
+            if op == 'add' or (op == 'update' and record_id in offsets):
+                offsets[record_id] = offset
+
+    def _load_offsets(self):
+        # 调用方需持有 self._lock
+        if self._offsets is None:
+            offsets = {}
+            self._scan_offsets(offsets, 0, self.meta['journal_size'])
+            self._offsets = offsets
+
+    def _read_at(self, offset):
+        """读取并解析指定位置的一行"""
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+    def _append(self, entries):
+        """
+        把若干操作追加到日志并落盘（调用方需持有 self._lock），返回各行的字节位置
+
+        写入或fsync失败时把日志截回写入前的长度再抛出异常，日志中不会留下
+        半批记录；统计与缓存只在落盘成功后才由调用方更新。
+        """
+        lines = [(json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8') for entry in entries]
+        data = b''.join(lines)
+        fd = self._file.fileno()
+        size = self.meta['journal_size']
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            # 落盘后才算写入成功，一批记录只需一次fsync
+            os.fsync(fd)
+        except BaseException:
+            try:
+                os.ftruncate(fd, size)
+            except OSError as e:
+                logger.error(f"{self.path} 写入失败后无法截断: {e}")
+            raise
+        self.meta['journal_size'] = os.fstat(fd).st_size
+        # 各行的起始字节位置
+        offsets = []
+        for line in lines:
+            offsets.append(size)
+            size += len(line)
+        return offsets
+
+    def append_many(self, records):
+        with self._lock:
+            first = self.meta['last_id'] + 1
+            entries = [{'op': 'add', 'id': first + i, 'data': dict(record)}
+                       for i, record in enumerate(records)]
+            for entry, offset in zip(entries, self._append(entries)):
+                self._apply_offset(entry, offset)
+                self._apply_meta(entry)
+            self._write_meta()
+            return [entry['id'] for entry in entries]
+
+    def records(self):
+        return list(self.iter_records())
+
+    def prepare_lookup(self):
+        # 扫描已落盘的部分时不持有锁，写入线程可以照常追加；
+        # 只在最后持锁并入扫描期间新追加的几行
+        with self._lock:
+            if self._offsets is not None:
+                return
+            size = self.meta['journal_size']
+        offsets = {}
+        self._scan_offsets(offsets, 0, size)
+        with self._lock:
+            if self._offsets is None:
+                self._scan_offsets(offsets, size, self.meta['journal_size'])
+                self._offsets = offsets
+
+    def _get(self, record_id):
+        # 调用方需持有 self._lock
+        self._load_offsets()
+        offset = self._offsets.get(record_id)
+        if offset is None:
+            return None
+        try:
+            entry = self._read_at(offset)
+        except ValueError:
+            entry = None
+        if not _valid_entry(entry):
+            logger.warning(f"{self.path} 中序号 {record_id} 的记录无法解析")
+            return None
+        return entry['data']
+
+    def get(self, record_id):
+        with self._lock:
+            return self._get(record_id)
+
+    def update(self, record_id, record):
+        """追加一条修改操作并落盘，res.xlsx 随之过期，由写入线程重新导出"""
+        with self._lock:
+            previous = self._get(record_id)
+            if previous is None:
+                raise KeyError(f"序号 {record_id} 的记录不存在")
+            entry = {'op': 'update', 'id': record_id, 'data': dict(record)}
+            self._apply_offset(entry, self._append([entry])[0])
+            self._apply_meta(entry, previous.get('意向学院'))
+            self._write_meta()
+
+    def _updated_records(self, limit):
+        """日志中被修改过的记录的最终内容；只完整解析修改操作所在的行"""
+        updated = {}
+        if not self.meta.get('updates'):
+            return updated
+        for lineno, offset, line in self._iter_lines(limit):
+            # 不含 "update" 的行不可能是修改操作，无需取操作类型
+            if b'"update"' not in line:
+                continue
+            head = _entry_head(line)
+            if head is None or head[0] != 'update':
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if _valid_entry(entry):
+                updated[head[1]] = entry['data']
+        return updated
+
+    def iter_records(self):
+        # 直接顺序读取日志而不缓存，序号随追加递增，日志顺序即序号顺序；
+        # 修改过的记录先单独扫描一遍取最终内容（通常只有少数几条）。
+        # 只读到当前已落盘的位置，导出期间新写入的记录留给下一次导出
+        limit = self.meta['journal_size']
+        updated = self._updated_records(limit)
+        for offset, entry in self._read_journal(limit):
+            if entry.get('op') == 'add':
+                record_id = int(entry['id'])
+                yield record_id, updated.get(record_id, entry['data'])
+
+    def count(self):
+        return self.meta['count']
+
+    def last_id(self):
+        return self.meta['last_id']
+
+    def stats(self):
+        """各意向学院的人数"""
+        return dict(self.meta['colleges'])
+
+    def version(self):
+        return self.meta['journal_size']
+
+    def mark_exported(self, version):
+        with self._lock:
+            self.meta['exported_version'] = version
+            self._write_meta()
+
+    def export_stale(self, path):
+        if self.count() == 0:
+            return False
+        return not os.path.exists(path) or self.meta.get('exported_version') != self.version()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def records_dataframe(store):
+    """将存储中的记录转换为以序号为索引的DataFrame"""
+    import pandas as pd
+
+    # 逐条读取日志，不经过存储的记录缓存，检查完即可释放
+    ids, rows = [], []
+    for record_id, record in store.iter_records():
+        ids.append(record_id)
+        rows.append(record)
+    df = pd.DataFrame(rows, columns=FIELDS, index=ids)
+    df.index.name = '序号'
+    return df
+
+
+def export_workbook(store, path):
+    """
+    由记录存储重新生成 Excel 导出文件，手机号强制为文本格式
+
+    使用 openpyxl 的只写模式逐行写出，不构建DataFrame和完整工作簿，
+    内存占用与记录数无关；手机号列的文本格式只在开头声明一次。
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    # 先取版本再读记录，期间若有新写入只会让导出被判为过期，不会漏导
+    version = store.version()
+    tmp_path = os.path.splitext(path)[0] + '.tmp.xlsx'
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Sheet1')
+    header_font = Font(bold=True)
+    header = []
+    for name in ['序号'] + FIELDS:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.font = header_font
+        header.append(cell)
+    ws.append(header)
+
+    # 只写模式下单元格追加后立即写出，同一个带格式的单元格可以逐行复用
+    phone_col = FIELDS.index('联系电话') + 1
+    phone_cell = WriteOnlyCell(ws)
+    phone_cell.number_format = '@'
+    count = 0
+    for record_id, record in store.iter_records():
+        row = [record_id] + [record.get(field) for field in FIELDS]
+        if row[phone_col] is not None:
+            phone_cell.value = str(row[phone_col])
+            row[phone_col] = phone_cell
+        ws.append(row)
+        count += 1
+    wb.save(tmp_path)
+    with open(tmp_path, 'rb+') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    store.mark_exported(version)
+    logger.info(f"已导出 {count} 条记录到 {path}")
+
+
+def import_workbook(store, path):
+    """将旧版 res.xlsx 中的记录导入存储（仅在日志为空时迁移一次）"""
+    import pandas as pd
+
+    df = pd.read_excel(path, index_col=0, dtype={'联系电话': str})
+    # 借助to_json把numpy类型和NaN转换为原生类型
+    records = json.loads(df.to_json(orient='records', force_ascii=False))
+    store.append_many(records)
+    logger.info(f"已从 {path} 迁移 {len(records)} 条记录到 {store.path}")
+    return len(records)
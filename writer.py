@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+后台写入线程
+
+"提交"只把记录放入队列，界面立即返回；写入线程把排队的记录合并成一次
+追加写入记录存储，并在空闲一段时间后重新生成res.xlsx，结果通过Qt信号通知界面。
+重新生成res.xlsx在单独的导出线程中进行（10万条约需25秒），期间写入线程继续
+把新提交的记录写入日志并落盘，不等待导出完成。
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from loguru import logger
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from metrics import span
+from store import export_workbook
+
+# 队列中的控制指令
+_EXPORT = object()
+_STOP = object()
+# 导出线程完成一次导出后放入队列，通知写入线程
+_EXPORTED = object()
+
+# 连续失败时重试间隔翻倍，最长间隔（秒）
+MAX_RETRY_DELAY = 300.0
+
+
+class SubmissionWriter(QThread):
+    """提交队列的消费线程"""
+    saved = pyqtSignal(list)    # 本批写入的序号
+    failed = pyqtSignal(str)    # 写入或导出失败的原因
+
+    def __init__(self, store, export_path, export_delay=5.0, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.export_path = export_path
+        self.export_delay = export_delay
+        self._queue = queue.Queue()
+        # 只保护下面的计数，任何时候都不在持有时读写磁盘，提交与查询人数不会等待写入
+        self._lock = threading.Lock()
+        self._processed_changed = threading.Condition(self._lock)
+        # 最近一次提交分配的序号；所有写入都经过本线程，按提交顺序追加，序号与存储分配的一致
+        self._next_id = store.last_id()
+        # 已写入存储的记录数，与 _pending 在同一把锁下更新，两者之和不会重复或遗漏
+        self._saved_count = store.count()
+        # 已提交、已尝试写入（成功或留待重试）的记录数，flush 据此等待
+        self._submitted = 0
+        self._processed = 0
+        self._pending = 0
+        self._unsaved = []
+        # 各类操作（save/export）连续失败的次数
+        self._failures = {}
+
+    def submit(self, record):
+        """将一条记录放入写入队列，返回其写入后的序号"""
+        # 序号接在存储的最大序号之后；写入失败的批次不占用序号，重试时序号不变
+        with self._lock:
+            self._pending += 1
+            self._submitted += 1
+            self._next_id += 1
+            record_id = self._next_id
+            # 在锁内入队，保证队列顺序与序号顺序一致
+            self._queue.put(dict(record))
+        return record_id
+
+    def request_export(self):
+        """要求尽快重新生成res.xlsx"""
+        self._queue.put(_EXPORT)
+
+    def flush(self, timeout=None):
+        """
+        等待此前提交的记录都已写入存储（写入失败的留待重试），不等待进行中的导出
+
+        返回:
+        是否在 timeout 秒内完成
+        """
+        with self._processed_changed:
+            target = self._submitted
+            return self._processed_changed.wait_for(lambda: self._processed >= target, timeout)
+
+    def request_stop(self):
+        """要求写完剩余记录并导出后结束线程，立即返回，结束时发出 finished 信号"""
+        self._queue.put(_STOP)
+
+    def stop(self):
+        """写完剩余记录并导出后结束线程，等待其结束"""
+        self.request_stop()
+        self.wait()
+
+    def total_count(self):
+        """已写入与排队中的记录总数"""
+        with self._lock:
+            return self._saved_count + self._pending
+
+    def run(self):
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='export') as pool:
+            self._run(pool)
+
+    def _run(self, pool):
+        dirty = False           # 有尚未导出的写入
+        requested = False       # 被要求导出（导出进行中收到的要求在完成后再执行）
+        stopping = False
+        final_export = False    # 退出前的最后一次导出已开始
+        exporting = None        # 进行中的导出
+        while True:
+            # 有未导出或未写入的记录时限时等待，空闲后再导出或重试；导出进行中时等待其完成通知
+            waiting = (dirty or self._unsaved) and exporting is None
+            try:
+                batch = [self._queue.get(timeout=self._retry_delay() if waiting else None)]
+            except queue.Empty:
+                batch = []
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # 先写日志并落盘，再考虑导出
+            records = [x for x in batch if isinstance(x, dict)]
+            if records or self._unsaved:
+                dirty = self._save(records) or dirty
+            if _EXPORTED in batch:
+                # 导出失败时保持待导出，按失败次数延后重试
+                dirty = not exporting.result() or dirty
+                exporting = None
+            requested = requested or _EXPORT in batch
+            stopping = stopping or _STOP in batch
+
+            if exporting is None:
+                if stopping:
+                    # 退出前只再导出一次，导出失败时下次启动会按记录日志重新导出
+                    if (dirty or requested) and not final_export:
+                        final_export = True
+                        dirty = requested = False
+                        exporting = self._start_export(pool)
+                        continue
+                    if self._unsaved:
+                        logger.error(f"仍有 {len(self._unsaved)} 条记录未能写入: {self._unsaved}")
+                    return
+                # 连续提交时只写日志，空闲或被要求时才导出
+                if requested or (dirty and not batch):
+                    dirty = requested = False
+                    exporting = self._start_export(pool)
+
+    def _start_export(self, pool):
+        """在导出线程中重新生成res.xlsx，完成后通知写入线程"""
+        future = pool.submit(self._export)
+        future.add_done_callback(lambda _: self._queue.put(_EXPORTED))
+        return future
+
+    def _retry_delay(self):
+        """空闲等待时间，连续失败时按次数翻倍"""
+        failures = max(self._failures.values(), default=0)
+        if not failures:
+            return self.export_delay
+        return min(self.export_delay * 2 ** failures, MAX_RETRY_DELAY)
+
+    def _report_failure(self, kind, message):
+        """同一类操作连续失败时只通知界面一次，之后只写日志"""
+        failures = self._failures.get(kind, 0) + 1
+        self._failures[kind] = failures
+        logger.error(f"{message}（连续第{failures}次）")
+        if failures == 1:
+            self.failed.emit(message)
+
+    def _report_success(self, kind):
+        failures = self._failures.pop(kind, 0)
+        if failures:
+            logger.info(f"{kind} 在连续失败{failures}次后恢复正常")
+
+    def _save(self, records):
+        """合并为一次写入，失败的记录保留到下一批重试"""
+        try:
+            return self._save_batch(self._unsaved + records)
+        finally:
+            with self._processed_changed:
+                self._processed += len(records)
+                self._processed_changed.notify_all()
+
+    def _save_batch(self, batch):
+        try:
+            # 写入与fsync期间不持有 self._lock
+            ids = self.store.append_many(batch)
+        except Exception as e:
+            # 存储在写入失败时不计入这批记录，重试时序号不变
+            self._unsaved = batch
+            self._report_failure('save', f"写入记录失败: {e}")
+            return False
+        with self._lock:
+            self._pending -= len(batch)
+            self._saved_count += len(batch)
+        self._unsaved = []
+        self._report_success('save')
+        self.saved.emit(ids)
+        return True
+
+    def _export(self):
+        if self.store.count() == 0:
+            return True
+        try:
+            with span('export', rows=self.store.count()):
+                export_workbook(self.store, self.export_path)
+        except Exception as e:
+            # 常见原因是res.xlsx正被Excel打开，替换文件失败
+            self._report_failure('export', f"导出res.xlsx失败: {e}")
+            return False
+        self._report_success('export')
+        return True